@@ -40,15 +40,25 @@ def migrate_group(group: str) -> dict[str, int]:
             conn.execute("SELECT chunk_role FROM chunks LIMIT 1")
         except Exception:
             return {}
-        counts: dict[str, int] = {}
-        for old_role, new_role in ROLE_MIGRATION:
-            cur = conn.execute(
-                "UPDATE chunks SET chunk_role = ? WHERE chunk_role = ?",
-                (new_role, old_role),
+        old_roles = [old for old, _ in ROLE_MIGRATION]
+        in_list = ",".join("?" * len(old_roles))
+        # Per-role counts from one grouped query, then every role rewritten by one UPDATE
+        counts: dict[str, int] = {
+            row[0]: row[1]
+            for row in conn.execute(
+                f"SELECT chunk_role, COUNT(*) FROM chunks WHERE chunk_role IN ({in_list}) GROUP BY chunk_role",
+                old_roles,
             )
-            n = cur.rowcount
-            if n:
-                counts[old_role] = n
+        }
+        if not counts:
+            return {}
+        cases = " ".join("WHEN ? THEN ?" for _ in ROLE_MIGRATION)
+        params = [v for pair in ROLE_MIGRATION for v in pair] + old_roles
+        conn.execute(
+            f"UPDATE chunks SET chunk_role = CASE chunk_role {cases} ELSE chunk_role END "
+            f"WHERE chunk_role IN ({in_list})",
+            params,
+        )
         conn.commit()
         return counts
     finally:
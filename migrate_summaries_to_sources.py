@@ -32,6 +32,8 @@ from ragdoll_ingest.storage import (
 )
 
 _MARKER = "[SUMMARY of "
+# Sources migrated per transaction (one commit per batch instead of one per group or per chunk)
+SOURCES_PER_TRANSACTION = 100
 
 
 def _strip_summary_from_text(text: str) -> tuple[str, str | None]:
@@ -135,13 +137,14 @@ def main() -> int:
         try:
             init_db(conn)
             raw = list_sources(conn)
-            for source_id, source_path, count, summary, _ext, _title in raw:
-                updated, set_summary = migrate_one_source(conn, group, source_id, source_path, summary)
-                total_stripped += updated
-                if set_summary:
-                    total_sources_with_summary += 1
-                    print(f"  [{group}] source_id={source_id} {Path(source_path).name}: set summary ({updated} chunk(s) stripped)")
-            conn.commit()
+            for i in range(0, len(raw), SOURCES_PER_TRANSACTION):
+                with conn:
+                    for source_id, source_path, count, summary, _ext, _title in raw[i : i + SOURCES_PER_TRANSACTION]:
+                        updated, set_summary = migrate_one_source(conn, group, source_id, source_path, summary)
+                        total_stripped += updated
+                        if set_summary:
+                            total_sources_with_summary += 1
+                            print(f"  [{group}] source_id={source_id} {Path(source_path).name}: set summary ({updated} chunk(s) stripped)")
         finally:
             conn.close()
     print(f"Done: {total_stripped} chunk(s) stripped, {total_sources_with_summary} source(s) with summary set.")
@@ -1,24 +1,113 @@
 """Action log: AI calls, file moves, extract/chunk/store. No embeddings or long text. Per-group."""
 
-import json
+import atexit
+import logging
+import queue
 import threading
+import time
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import BinaryIO
 
 from . import config
+from .fastjson import dumps_bytes
 
-_lock = threading.Lock()
+logger = logging.getLogger(__name__)
+
+# Writer batching: lines are written when this many are pending or this many seconds have passed
+_FLUSH_RECORDS = 256
+_FLUSH_INTERVAL = 0.1
+_QUEUE_MAX = 10_000
+
+
+class _GroupLogger:
+    """
+    Background writer for all group action logs. log() only enqueues the line; one daemon
+    thread keeps an append handle open per log file and writes queued lines in batches.
+    """
+
+    def __init__(self) -> None:
+        self._queue: queue.Queue = queue.Queue(maxsize=_QUEUE_MAX)
+        self._files: dict[Path, BinaryIO] = {}
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+
+    def put(self, path: Path, line: bytes) -> None:
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    t = threading.Thread(target=self._run, name="action-log-writer", daemon=True)
+                    t.start()
+                    self._thread = t
+        self._queue.put((path, line))
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Block until every line queued before this call has been written (or timeout)."""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        done = threading.Event()
+        self._queue.put((None, done))
+        done.wait(timeout)
+
+    def _write(self, pending: dict[Path, list[bytes]]) -> None:
+        for path, lines in pending.items():
+            try:
+                f = self._files.get(path)
+                if f is None:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    f = self._files[path] = open(path, "ab")
+                f.write(b"".join(lines))
+                f.flush()
+            except OSError as e:
+                logger.warning("Action log write failed for %s: %s", path, e)
+                f = self._files.pop(path, None)
+                if f is not None:
+                    try:
+                        f.close()
+                    except OSError:
+                        pass
+
+    def _run(self) -> None:
+        pending: dict[Path, list[bytes]] = {}
+        count = 0
+        last_flush = time.monotonic()
+        while True:
+            try:
+                path, item = self._queue.get(timeout=_FLUSH_INTERVAL)
+            except queue.Empty:
+                path, item = None, None
+            if path is not None:
+                pending.setdefault(path, []).append(item)
+                count += 1
+            if count and (
+                path is None or count >= _FLUSH_RECORDS or time.monotonic() - last_flush >= _FLUSH_INTERVAL
+            ):
+                self._write(pending)
+                pending = {}
+                count = 0
+                last_flush = time.monotonic()
+            if path is None and item is not None:
+                item.set()  # flush marker from flush()
+
+
+_writer = _GroupLogger()
+
+
+def flush_all() -> None:
+    """Write out all queued action log records. Registered with atexit."""
+    _writer.flush()
+
+
+atexit.register(flush_all)
 
 
 def log(action: str, group: str = "_root", **kwargs: object) -> None:
     """
-    Append one JSONL record to the group's action log. Keys and values must be JSON-serializable.
+    Append one JSONL record to the group's action log. Values that are not JSON types are logged as str().
     Do not pass 'embedding', 'embeddings', or raw embedding vectors.
+    Records are written asynchronously in batches; call flush_all() to wait for them.
     """
     gp = config.get_group_paths(group or "_root")
-    gp.group_dir.mkdir(parents=True, exist_ok=True)
     rec = {"ts": datetime.now(timezone.utc).isoformat(), "action": action, **kwargs}
-    line = json.dumps(rec, ensure_ascii=False) + "\n"
-    with _lock:
-        with open(gp.action_log_path, "a", encoding="utf-8") as f:
-            f.write(line)
+    line = dumps_bytes(rec) + b"\n"
+    _writer.put(gp.action_log_path, line)
@@ -1,22 +1,45 @@
 """HTTP API server for RAG queries."""
 
+import asyncio
+import hashlib
 import json
 import logging
-import math
+import os
 import re
+import sqlite3
+import stat
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, NamedTuple, Sequence
+from urllib.parse import quote
 
-import requests
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.responses import FileResponse, JSONResponse
 from pydantic import BaseModel
 
-from . import config
+from . import config, ollama
 from .embedder import embed
+from .fastjson import loads
 from .interpreters import CHUNK_ROLES
 from .memory import MEMORY_GROUP, parse_memory_summary
-from .storage import _connect, _list_sync_groups, clean_text, get_source_summary_by_path, init_db
+from .similarity import ann_matches, as_matrix, build_ann_index, unit_matches, unit_matches_batch
+from .storage import (
+    _connect,
+    _db_file_id,
+    _list_sync_groups,
+    _migrate_sources_table,
+    clean_text,
+    connect_readonly,
+    decode_embedding,
+    encode_embedding,
+    get_source_summaries_by_paths,
+    init_db,
+    load_sqlite_vec,
+)
 from .config import get_group_paths, _sanitize_group
 
 logger = logging.getLogger(__name__)
@@ -34,19 +57,86 @@ class QueryRequest(BaseModel):
     synthesis_mode: str = "instructions"  # "instructions" (for an assistant) or "answer" (direct summary)
 
 
-def _cosine_similarity(a: list[float], b: list[float]) -> float:
-    """Compute cosine similarity between two vectors."""
-    dot = sum(x * y for x, y in zip(a, b))
-    norm_a = math.sqrt(sum(x * x for x in a))
-    norm_b = math.sqrt(sum(x * x for x in b))
-    if norm_a == 0 or norm_b == 0:
-        return 0.0
-    return dot / (norm_a * norm_b)
+class BatchQueryRequest(BaseModel):
+    prompts: list[str]
+    threshold: float = config.QUERY_THRESHOLD
+    group: list[str] | None = None  # Optional: collections to query; if None or empty, searches all
+
+
+# Query expansions and query embeddings are cached for repeated prompts (entries expire after the TTL)
+QUERY_CACHE_MAX = 1024
+QUERY_CACHE_TTL = 3600.0
+
+
+class _TTLCache:
+    """Small thread-safe LRU cache whose entries expire ttl seconds after they are set."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self._data: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Any | None:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            if item[0] < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return item[1]
+
+    def set(self, key: Any, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self._ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+
+
+_expansion_cache = _TTLCache(QUERY_CACHE_MAX, QUERY_CACHE_TTL)
+_query_embedding_cache = _TTLCache(QUERY_CACHE_MAX, QUERY_CACHE_TTL)
+
+
+def _text_key(text: str | None) -> bytes | None:
+    """Compact cache key for possibly long text."""
+    return None if text is None else hashlib.blake2s(text.encode("utf-8")).digest()
+
+
+def _embed_query(text: str) -> list[float]:
+    """Embed one query string, reusing the vector for repeated text."""
+    key = (config.EMBED_MODEL, _text_key(text))
+    emb = _query_embedding_cache.get(key)
+    if emb is None:
+        emb = embed([text], group="_api")[0]
+        _query_embedding_cache.set(key, emb)
+    return emb
+
+
+def _embed_queries(texts: list[str]) -> list[list[float]]:
+    """Embed several query strings; cached vectors are reused and the rest are embedded in one call."""
+    keys = [(config.EMBED_MODEL, _text_key(t)) for t in texts]
+    embs = [_query_embedding_cache.get(k) for k in keys]
+    missing = [i for i, e in enumerate(embs) if e is None]
+    if missing:
+        new = embed([texts[i] for i in missing], group="_api")
+        for i, emb in zip(missing, new):
+            embs[i] = emb
+            _query_embedding_cache.set(keys[i], emb)
+    return embs
 
 
 def _expand_query(prompt: str, history: str | None) -> str:
-    """Use LLM to produce a standalone description of the user's information need."""
+    """Use LLM to produce a standalone description of the user's information need.
+    Successful expansions are cached per (model, prompt, history); fallbacks to the raw prompt are not.
+    """
     model = config.QUERY_MODEL
+    cache_key = (model, _text_key(prompt), _text_key(history))
+    cached = _expansion_cache.get(cache_key)
+    if cached is not None:
+        return cached
     url = (config.OLLAMA_HOST or "").rstrip("/")
     
     if history:
@@ -65,17 +155,18 @@ def _expand_query(prompt: str, history: str | None) -> str:
         )
     
     try:
-        r = requests.post(
+        r = ollama.session().post(
             f"{url}/api/generate",
             json={"model": model, "prompt": prompt_text, "stream": False},
             timeout=config.CHUNK_LLM_TIMEOUT,
         )
         r.raise_for_status()
-        response = r.json().get("response", "").strip()
+        response = loads(r.content).get("response", "").strip()
         if not response:
             # Fallback to original prompt if LLM fails
             logger.warning("Query expansion returned empty, using original prompt")
             return prompt
+        _expansion_cache.set(cache_key, response)
         return response
     except Exception as e:
         logger.warning("Query expansion failed: %s, using original prompt", e)
@@ -102,20 +193,20 @@ def _infer_chunk_roles(prompt: str, history: str | None) -> list[str]:
     model = config.QUERY_MODEL
     url = (config.OLLAMA_HOST or "").rstrip("/")
     try:
-        r = requests.post(
+        r = ollama.session().post(
             f"{url}/api/generate",
             json={"model": model, "prompt": prompt_text, "stream": False},
             timeout=config.CHUNK_LLM_TIMEOUT,
         )
         r.raise_for_status()
-        response = r.json().get("response", "").strip()
+        response = loads(r.content).get("response", "").strip()
         if not response:
             return []
         if "```" in response:
             m = re.search(r"```(?:json)?\s*([\s\S]*?)```", response)
             if m:
                 response = m.group(1).strip()
-        obj = json.loads(response)
+        obj = loads(response)
         raw = obj.get("roles")
         if not isinstance(raw, list):
             return []
@@ -140,6 +231,13 @@ def list_rags() -> dict[str, Any]:
     return {"collections": groups}
 
 
+
+@lru_cache(maxsize=128)
+def _sources_dir_resolved(safe_group: str) -> str:
+    """Resolved sources directory of a (sanitized) group; DATA_DIR is fixed for the process, so cache it."""
+    return str(get_group_paths(safe_group).sources_dir.resolve())
+
+
 @app.get("/fetch/{group}/{filename:path}")
 def fetch_source(group: str, filename: str) -> FileResponse:
     """
@@ -152,53 +250,345 @@ def fetch_source(group: str, filename: str) -> FileResponse:
     """
     # Sanitize group name (imported from config)
     safe_group = _sanitize_group(group)
+    sources_dir = _sources_dir_resolved(safe_group)
     
-    # Get the group's sources directory
-    gp = get_group_paths(safe_group)
-    sources_dir = gp.sources_dir
-    
-    # Build the file path
-    file_path = sources_dir / filename
-    
-    # Security: Ensure the file is within the sources directory (prevent path traversal)
+    # Security: Ensure the file is within the sources directory (prevent path traversal).
+    # The target is still resolved so a symlink inside sources/ cannot point outside it.
     try:
-        file_path = file_path.resolve()
-        sources_dir = sources_dir.resolve()
-        if not str(file_path).startswith(str(sources_dir)):
+        file_path = (Path(sources_dir) / filename).resolve()
+        if os.path.commonpath([sources_dir, str(file_path)]) != sources_dir:
             raise HTTPException(status_code=403, detail="Access denied: path outside sources directory")
     except (ValueError, OSError):
         raise HTTPException(status_code=400, detail="Invalid path")
     
-    # Check if file exists
-    if not file_path.exists() or not file_path.is_file():
+    # Check if file exists (one stat, handed to FileResponse so it does not stat again)
+    try:
+        st = file_path.stat()
+    except OSError:
+        st = None
+    if st is None or not stat.S_ISREG(st.st_mode):
         raise HTTPException(status_code=404, detail=f"Source file not found: {filename}")
     
     # Determine content type based on extension
-    ext = file_path.suffix.lower()
-    media_types = {
-        ".pdf": "application/pdf",
-        ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        ".doc": "application/msword",
-        ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        ".xls": "application/vnd.ms-excel",
-        ".txt": "text/plain",
-        ".md": "text/markdown",
-        ".png": "image/png",
-        ".jpg": "image/jpeg",
-        ".jpeg": "image/jpeg",
-        ".gif": "image/gif",
-        ".bmp": "image/bmp",
-        ".tiff": "image/tiff",
-        ".tif": "image/tiff",
-    }
-    media_type = media_types.get(ext, "application/octet-stream")
+    media_type = config.SOURCE_MEDIA_TYPES.get(file_path.suffix.lower(), "application/octet-stream")
     
     return FileResponse(
         path=str(file_path),
+        stat_result=st,
         media_type=media_type,
         filename=file_path.name,
-        headers={"Content-Disposition": f'inline; filename="{file_path.name}"'}
+        headers={"Content-Disposition": f'inline; filename="{file_path.name}"'},
+    )
+
+
+class _GroupMatrix(NamedTuple):
+    dim: int
+    matrix: Any  # from similarity.as_matrix
+    metas: list[dict[str, Any]]
+    ann: Any  # HNSW index from similarity.build_ann_index, or None for exact search
+
+
+# Per-group retrieval cache: group -> (DB file signature, _GroupMatrix).
+# Rebuilt when the DB or its WAL changes on disk, so queries between ingests skip the SQLite scan and decode.
+_EMB_CACHE: dict[str, tuple[tuple, _GroupMatrix]] = {}
+_EMB_CACHE_LOCKS: dict[str, threading.Lock] = {}
+_EMB_CACHE_LOCKS_GUARD = threading.Lock()
+
+
+# Groups whose schema and migrations have been brought up to date by this process:
+# group -> storage._db_file_id of the DB file they were run on (a replaced file is migrated again)
+_schema_ready: dict[str, tuple] = {}
+_schema_lock = threading.Lock()
+
+
+def _read_conn(group_name: str) -> sqlite3.Connection:
+    """
+    Pooled read-only connection for query paths. The first call per group (and per DB file, if the
+    file is deleted and recreated) runs init_db and the sources migration once on a normal
+    connection; after that reads skip both.
+    """
+    db_path = get_group_paths(group_name).rag_db_path
+    file_id = _db_file_id(db_path)
+    if file_id is None or _schema_ready.get(group_name) != file_id:
+        with _schema_lock:
+            file_id = _db_file_id(db_path)
+            if file_id is None or _schema_ready.get(group_name) != file_id:
+                conn = _connect(group_name)
+                try:
+                    init_db(conn)
+                    _migrate_sources_table(conn)
+                    conn.commit()
+                finally:
+                    conn.close()
+                _schema_ready[group_name] = _db_file_id(db_path)
+    return connect_readonly(group_name)
+
+
+def _db_signature(db_path: Path) -> tuple:
+    """(mtime_ns, size) of the DB file and its WAL; changes whenever a write lands in either."""
+    sig = []
+    for p in (db_path, db_path.with_name(db_path.name + "-wal")):
+        try:
+            st = p.stat()
+            sig.append((st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            sig.append(None)
+    return tuple(sig)
+
+
+def _load_group_matrix(group_name: str) -> _GroupMatrix:
+    """
+    Return a group's chunks as a _GroupMatrix: matrix holds one unit-length embedding per row
+    (see similarity.as_matrix), metas the matching row fields without the embedding, and ann an
+    HNSW index when the group is large enough (config.ANN_MIN_CHUNKS). Cached per group and
+    reloaded only when the DB files change.
+    """
+    # Signature is taken before reading, so a write that lands mid-load forces a reload next time
+    sig = _db_signature(get_group_paths(group_name).rag_db_path)
+    with _EMB_CACHE_LOCKS_GUARD:
+        lock = _EMB_CACHE_LOCKS.setdefault(group_name, threading.Lock())
+    with lock:
+        hit = _EMB_CACHE.get(group_name)
+        if hit is not None and hit[0] == sig:
+            return hit[1]
+        # Positional rows (embedding last) instead of sqlite3.Row: one tuple unpack per row, no name lookups
+        cur = _read_conn(group_name).cursor()
+        cur.row_factory = None
+        try:
+            sql = (
+                "SELECT c.source_path, c.source_type, c.chunk_index, c.text, "
+                "c.artifact_type, c.artifact_path, c.page, s.display_title, "
+                "c.primary_question_answered, c.chunk_role, c.embedding "
+                "FROM chunks c "
+                "LEFT JOIN sources s ON s.source_path = c.source_path"
+            )
+            rows = cur.execute(sql).fetchall()
+        except Exception:
+            sql = (
+                "SELECT c.source_path, c.source_type, c.chunk_index, c.text, "
+                "c.artifact_type, c.artifact_path, c.page, s.display_title, c.chunk_role, c.embedding "
+                "FROM chunks c "
+                "LEFT JOIN sources s ON s.source_path = c.source_path"
+            )
+            rows = cur.execute(sql).fetchall()
+        columns = [d[0] for d in cur.description][:-1]
+        cur.close()
+
+        decoded: list[tuple[dict[str, Any], Sequence[float]]] = []
+        for *values, blob in rows:
+            try:
+                chunk_emb = decode_embedding(blob)
+            except (json.JSONDecodeError, ValueError) as e:
+                logger.warning("Invalid embedding for chunk %s/%s/%d: %s", group_name, values[0], values[2], e)
+                continue
+            decoded.append((dict(zip(columns, values)), chunk_emb))
+        # All chunks of a group come from one embedding model; rows of any other size are unusable
+        dim = Counter(len(e) for _, e in decoded).most_common(1)[0][0] if decoded else 0
+        kept = [(m, e) for m, e in decoded if len(e) == dim]
+        if len(kept) < len(decoded):
+            logger.warning(
+                "Skipped %d chunk(s) in %s whose embedding size differs from the rest (%d); re-embed the collection",
+                len(decoded) - len(kept), group_name, dim,
+            )
+        metas = [m for m, _ in kept]
+        int8 = "*" in config.QUERY_INT8_GROUPS or group_name in config.QUERY_INT8_GROUPS
+        matrix = as_matrix([e for _, e in kept], int8=int8)
+        ann = None
+        if config.ANN_MIN_CHUNKS and len(metas) >= config.ANN_MIN_CHUNKS:
+            ann = build_ann_index(matrix)
+            if ann is None:
+                logger.warning("RAGDOLL_ANN_MIN_CHUNKS is set but usearch is not available; using exact search for %s", group_name)
+        entry = _GroupMatrix(dim, matrix, metas, ann)
+        _EMB_CACHE[group_name] = (sig, entry)
+        logger.info(
+            "Loaded %d chunk embedding(s) for %s into the retrieval cache%s",
+            len(metas), group_name, " (HNSW index)" if ann is not None else "",
+        )
+        return entry
+
+
+# Max groups searched concurrently (each is an independent SQLite file and scan)
+RETRIEVAL_MAX_WORKERS = 8
+# One long-lived pool for every multi-group query: its threads keep their pooled read-only
+# connections (storage.connect_readonly is per thread) and sqlite-vec loads across queries
+_retrieval_pool = ThreadPoolExecutor(max_workers=RETRIEVAL_MAX_WORKERS, thread_name_prefix="ragdoll-retrieval")
+
+
+# Characters that quote() would escape in a path segment; most source paths contain none
+_UNSAFE_PATH_RE = re.compile(r"[^A-Za-z0-9._~/-]")
+
+
+def _encode_url_path(path_str: str) -> str:
+    """Percent-encode each /-separated segment of a relative path (no-op fast path when nothing needs escaping)."""
+    if not _UNSAFE_PATH_RE.search(path_str):
+        return path_str
+    return "/".join(quote(part, safe="") for part in path_str.split("/"))
+
+
+def _cached_hits(
+    group_name: str, query_emb: list[float], threshold: float, roles: set[str] | None
+) -> list[tuple[dict[str, Any], float]]:
+    """(row metadata, similarity) for chunks at or above threshold, scored against the cached group matrix."""
+    dim, matrix, metas, ann = _load_group_matrix(group_name)
+    if not metas:
+        return []
+    if dim != len(query_emb):
+        logger.warning(
+            "Skipping %s: chunk embeddings have %d dimensions but the query has %d; re-embed the collection",
+            group_name, dim, len(query_emb),
+        )
+        return []
+    # Stored embeddings are unit length (storage.SCHEMA_VERSION), so cosine is a dot product
+    if ann is not None:
+        matches = ann_matches(ann, query_emb, threshold, config.ANN_TOP_K)
+    else:
+        matches = unit_matches(query_emb, matrix, threshold)
+    return [
+        (metas[i], similarity) for i, similarity in matches
+        if roles is None or metas[i].get("chunk_role") in roles
+    ]
+
+
+def _cached_hits_batch(
+    group_name: str, query_embs: list[list[float]], threshold: float
+) -> list[list[tuple[dict[str, Any], float]]]:
+    """_cached_hits for several queries, one hit list per query; exact search scores them all in one matrix product."""
+    dim, matrix, metas, ann = _load_group_matrix(group_name)
+    if not metas:
+        return [[] for _ in query_embs]
+    if any(dim != len(q) for q in query_embs):
+        logger.warning(
+            "Skipping %s: chunk embeddings have %d dimensions but the queries do not; re-embed the collection",
+            group_name, dim,
+        )
+        return [[] for _ in query_embs]
+    if ann is not None:
+        batches = [ann_matches(ann, q, threshold, config.ANN_TOP_K) for q in query_embs]
+    else:
+        batches = unit_matches_batch(query_embs, matrix, threshold)
+    return [[(metas[i], similarity) for i, similarity in matches] for matches in batches]
+
+
+# Set once sqlite-vec fails to load, so later queries go straight to the in-memory path
+_sqlite_vec_disabled = False
+
+
+def _sqlite_vec_hits(
+    group_name: str, query_emb: list[float], threshold: float, roles: set[str] | None
+) -> list[tuple[dict[str, Any], float]] | None:
+    """
+    Like _cached_hits, but scored inside SQLite by sqlite-vec's vec_distance_cosine, so only matching
+    rows reach Python and no group matrix is held in memory. None if sqlite-vec is unavailable.
+    """
+    global _sqlite_vec_disabled
+    if _sqlite_vec_disabled:
+        return None
+    conn = _read_conn(group_name)
+    try:
+        load_sqlite_vec(conn)
+    except RuntimeError as e:
+        logger.warning("RAGDOLL_QUERY_SQLITE_VEC is set but %s; using in-memory search", e)
+        _sqlite_vec_disabled = True
+        return None
+    where = ""
+    params: list[Any] = [4 * len(query_emb), encode_embedding(query_emb)]
+    if roles is not None:
+        where = f" WHERE c.chunk_role IN ({','.join('?' * len(roles))})"
+        params.extend(roles)
+    params.append(1.0 - threshold)
+    # CASE keeps vec_distance_cosine off rows of another dimension (it raises on a size mismatch)
+    sql = (
+        "SELECT * FROM ("
+        "SELECT c.source_path, c.source_type, c.chunk_index, c.text, "
+        "c.artifact_type, c.artifact_path, c.page, s.display_title, "
+        "c.primary_question_answered, c.chunk_role, "
+        "CASE WHEN length(c.embedding) = ? THEN vec_distance_cosine(c.embedding, ?) END AS distance "
+        "FROM chunks c "
+        "LEFT JOIN sources s ON s.source_path = c.source_path" + where +
+        ") WHERE distance <= ?"
     )
+    cur = conn.cursor()
+    cur.row_factory = None
+    try:
+        rows = cur.execute(sql, params).fetchall()
+        columns = [d[0] for d in cur.description][:-1]
+    finally:
+        cur.close()
+    return [(dict(zip(columns, values)), 1.0 - distance) for *values, distance in rows]
+
+
+def _search_group(
+    group_name: str,
+    query_emb: list[float],
+    threshold: float,
+    role_filter: list[str] | None,
+) -> list[dict[str, Any]]:
+    """Similarity retrieval over one group; see _run_retrieval. Returns unsorted results."""
+    # Apply role filter only to non-memory groups (memory uses conclusion/reasoning/open_threads/full)
+    use_role_filter = role_filter and group_name != MEMORY_GROUP
+    roles = set(role_filter) if use_role_filter else None
+    hits = None
+    if config.QUERY_SQLITE_VEC:
+        hits = _sqlite_vec_hits(group_name, query_emb, threshold, roles)
+    if hits is None:
+        hits = _cached_hits(group_name, query_emb, threshold, roles)
+    return _hit_results(group_name, hits)
+
+
+def _hit_results(group_name: str, hits: list[tuple[dict[str, Any], float]]) -> list[dict[str, Any]]:
+    """Build API result dicts (display name, fetch URL, cleaned text) for one group's (row, similarity) hits."""
+    results: list[dict[str, Any]] = []
+    gp = get_group_paths(group_name)
+    for row, similarity in hits:
+        source_path = row["source_path"]
+        path_basename = Path(source_path).name
+        raw_title = row.get("display_title")
+        if raw_title and isinstance(raw_title, str):
+            raw_title = raw_title.strip() or None
+        source_name = raw_title or path_basename
+        fetch_url = None
+        # Memory group has no on-disk source files; skip fetch URL to avoid 404
+        if group_name != MEMORY_GROUP:
+            try:
+                full_source_path = Path(source_path)
+                if full_source_path.is_absolute():
+                    try:
+                        rel_path = full_source_path.relative_to(gp.sources_dir)
+                    except ValueError:
+                        rel_path = Path(path_basename)
+                else:
+                    rel_path = Path(source_path)
+                parts = rel_path.parts
+                if len(parts) > 0 and parts[0] == "sources":
+                    rel_path = Path(*parts[1:])
+                path_str = str(rel_path).replace("\\", "/")
+                fetch_url = f"/fetch/{group_name}/{_encode_url_path(path_str)}"
+            except Exception as e:
+                logger.warning("Could not build fetch URL for %s: %s", source_path, e)
+        pq = row.get("primary_question_answered") or None
+        if pq and isinstance(pq, str):
+            pq = pq.strip() or None
+        chunk_role_val = row.get("chunk_role")
+        if chunk_role_val and isinstance(chunk_role_val, str):
+            chunk_role_val = chunk_role_val.strip() or None
+        else:
+            chunk_role_val = None
+        results.append({
+            "group": group_name,
+            "source_path": source_path,
+            "source_type": row["source_type"],
+            "source_name": source_name,
+            "source_url": fetch_url,
+            "chunk_index": row["chunk_index"],
+            "text": clean_text(row["text"]),
+            "primary_question_answered": pq,
+            "chunk_role": chunk_role_val,
+            "artifact_type": row["artifact_type"] or "text",
+            "artifact_path": row["artifact_path"],
+            "page": row["page"],
+            "similarity": round(similarity, 4),
+        })
+    return results
 
 
 def _run_retrieval(
@@ -210,105 +600,56 @@ def _run_retrieval(
     """Run similarity retrieval over groups with optional chunk_role filter. Returns sorted results.
     role_filter uses document CHUNK_ROLES (description, application, implication); the memory group
     uses different roles (conclusion, reasoning, open_threads, full) so we never apply role_filter to it.
+    Groups are searched in parallel on _retrieval_pool when there is more than one.
     """
     results: list[dict[str, Any]] = []
-    for group_name in groups:
-        conn = _connect(group_name)
-        try:
-            init_db(conn)
-            # Apply role filter only to non-memory groups (memory uses conclusion/reasoning/open_threads/full)
-            use_role_filter = role_filter and group_name != MEMORY_GROUP
-            if use_role_filter:
-                placeholders = ",".join("?" * len(role_filter))
-                where = f" WHERE c.chunk_role IN ({placeholders})"
-            else:
-                where = ""
-            params: tuple = tuple(role_filter) if use_role_filter else ()
-            try:
-                sql = (
-                    "SELECT c.source_path, c.source_type, c.chunk_index, c.text, c.embedding, "
-                    "c.artifact_type, c.artifact_path, c.page, s.display_title, "
-                    "c.primary_question_answered, c.chunk_role "
-                    "FROM chunks c "
-                    "LEFT JOIN sources s ON s.source_path = c.source_path" + where
-                )
-                rows = conn.execute(sql, params).fetchall()
-            except Exception:
-                sql = (
-                    "SELECT c.source_path, c.source_type, c.chunk_index, c.text, c.embedding, "
-                    "c.artifact_type, c.artifact_path, c.page, s.display_title, c.chunk_role "
-                    "FROM chunks c "
-                    "LEFT JOIN sources s ON s.source_path = c.source_path" + where
-                )
-                rows = conn.execute(sql, params).fetchall()
-
-            for row in rows:
-                try:
-                    chunk_emb = json.loads(row["embedding"])
-                    similarity = _cosine_similarity(query_emb, chunk_emb)
-                    if similarity < threshold:
-                        continue
-                    source_path = row["source_path"]
-                    path_basename = Path(source_path).name
-                    raw_title = row["display_title"] if "display_title" in row.keys() else None
-                    if raw_title and isinstance(raw_title, str):
-                        raw_title = raw_title.strip() or None
-                    source_name = raw_title or path_basename
-                    fetch_url = None
-                    # Memory group has no on-disk source files; skip fetch URL to avoid 404
-                    if group_name != MEMORY_GROUP:
-                        gp = get_group_paths(group_name)
-                        try:
-                            full_source_path = Path(source_path)
-                            if full_source_path.is_absolute():
-                                try:
-                                    rel_path = full_source_path.relative_to(gp.sources_dir)
-                                except ValueError:
-                                    rel_path = Path(path_basename)
-                            else:
-                                rel_path = Path(source_path)
-                            parts = rel_path.parts
-                            if len(parts) > 0 and parts[0] == "sources":
-                                rel_path = Path(*parts[1:])
-                            path_str = str(rel_path).replace("\\", "/")
-                            from urllib.parse import quote
-                            encoded_path = "/".join(quote(part, safe="") for part in path_str.split("/"))
-                            fetch_url = f"/fetch/{group_name}/{encoded_path}"
-                        except Exception as e:
-                            logger.warning("Could not build fetch URL for %s: %s", source_path, e)
-                    pq = None
-                    if "primary_question_answered" in row.keys():
-                        pq = row["primary_question_answered"] or None
-                        if pq and isinstance(pq, str):
-                            pq = pq.strip() or None
-                    chunk_role_val = row["chunk_role"] if "chunk_role" in row.keys() else None
-                    if chunk_role_val and isinstance(chunk_role_val, str):
-                        chunk_role_val = chunk_role_val.strip() or None
-                    else:
-                        chunk_role_val = None
-                    results.append({
-                        "group": group_name,
-                        "source_path": source_path,
-                        "source_type": row["source_type"],
-                        "source_name": source_name,
-                        "source_url": fetch_url,
-                        "chunk_index": row["chunk_index"],
-                        "text": clean_text(row["text"]),
-                        "primary_question_answered": pq,
-                        "chunk_role": chunk_role_val,
-                        "artifact_type": row["artifact_type"] or "text",
-                        "artifact_path": row["artifact_path"],
-                        "page": row["page"],
-                        "similarity": round(similarity, 4),
-                    })
-                except (json.JSONDecodeError, ValueError) as e:
-                    logger.warning("Invalid embedding for chunk %s/%s/%d: %s", group_name, row["source_path"], row["chunk_index"], e)
-        finally:
-            conn.close()
+    if len(groups) <= 1:
+        for group_name in groups:
+            results.extend(_search_group(group_name, query_emb, threshold, role_filter))
+    else:
+        for group_results in _retrieval_pool.map(lambda g: _search_group(g, query_emb, threshold, role_filter), groups):
+            results.extend(group_results)
     results.sort(key=lambda x: x["similarity"], reverse=True)
     return results
 
 
+def _run_batch_retrieval(
+    groups: list[str],
+    query_embs: list[list[float]],
+    threshold: float,
+) -> list[list[dict[str, Any]]]:
+    """Like _run_retrieval for several query embeddings: one sorted result list per query.
+    Each group's cached matrix is loaded once and scored against all queries together; with
+    config.QUERY_SQLITE_VEC each query is instead scored inside SQLite, as _search_group does.
+    """
+    per_query: list[list[dict[str, Any]]] = [[] for _ in query_embs]
+
+    def search(group_name: str) -> list[list[dict[str, Any]]]:
+        batches = None
+        if config.QUERY_SQLITE_VEC:
+            batches = []
+            for query_emb in query_embs:
+                hits = _sqlite_vec_hits(group_name, query_emb, threshold, None)
+                if hits is None:
+                    batches = None
+                    break
+                batches.append(hits)
+        if batches is None:
+            batches = _cached_hits_batch(group_name, query_embs, threshold)
+        return [_hit_results(group_name, hits) for hits in batches]
+
+    if len(groups) <= 1:
+        group_batches = map(search, groups)
+    else:
+        group_batches = list(_retrieval_pool.map(search, groups))
+    for batch in group_batches:
+        for results, group_results in zip(per_query, batch):
+            results.extend(group_results)
+    for results in per_query:
+        results.sort(key=lambda x: x["similarity"], reverse=True)
+    return per_query
+
+
 def _enrich_results_with_summary_and_context_index(
     results: list[dict[str, Any]],
 ) -> list[dict[str, Any]]:
@@ -318,12 +659,11 @@ def _enrich_results_with_summary_and_context_index(
     keys = set((r["group"], r["source_path"]) for r in results)
     key_to_summary: dict[tuple[str, str], str | None] = {}
     for group in set(g for g, _ in keys):
-        conn = _connect(group)
-        try:
-            for source_path in [p for g, p in keys if g == group]:
-                key_to_summary[(group, source_path)] = get_source_summary_by_path(conn, source_path)
-        finally:
-            conn.close()
+        summaries = get_source_summaries_by_paths(
+            _read_conn(group), [p for g, p in keys if g == group], ensure_schema=False
+        )
+        for source_path, summary in summaries.items():
+            key_to_summary[(group, source_path)] = summary
     key_to_count: dict[tuple[str, str], int] = {}
     for r in results:
         k = (r["group"], r["source_path"])
@@ -435,20 +775,34 @@ def _synthesize_rag_results(
             "Instructions for the assistant:"
         )
     try:
-        r = requests.post(
+        r = ollama.session().post(
             f"{url}/api/generate",
             json={"model": model, "prompt": prompt_text, "stream": False},
             timeout=config.CHUNK_LLM_TIMEOUT,
         )
         r.raise_for_status()
-        response = r.json().get("response", "").strip()
+        response = loads(r.content).get("response", "").strip()
         return response or "(Synthesis produced no text.)"
     except Exception as e:
         logger.warning("Synthesis failed: %s", e)
         return f"(Synthesis failed: {e})"
 
 
-def _do_query(
+def _resolve_groups(group: list[str] | None) -> list[str]:
+    """Collections to search: the requested ones (404 if any are unknown), or all when none are given."""
+    all_groups = _list_sync_groups()
+    if group and len(group) > 0:
+        missing = [g for g in group if g not in all_groups]
+        if missing:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Collection(s) not found: {missing}. Available: {all_groups}",
+            )
+        return list(group)
+    return all_groups
+
+
+async def _do_query(
     prompt: str,
     history: str | None,
     threshold: float,
@@ -457,7 +811,8 @@ def _do_query(
     synthesize: bool = False,
     synthesis_mode: str = "instructions",
 ) -> dict[str, Any]:
-    """Shared query logic for GET and POST endpoints.
+    """Shared query logic for GET and POST endpoints (and the MCP server).
+    Blocking work (Ollama calls, SQLite, scoring) runs in worker threads so the event loop stays free.
     
     Args:
         prompt: User's query/question
@@ -469,41 +824,34 @@ def _do_query(
         synthesize: If true, call LLM to synthesize prompt + history + top chunks into instructions or an answer.
         synthesis_mode: "instructions" (for an assistant) or "answer" (direct summary).
     """
-    # Optionally infer chunk roles from user input (prompt + context); uses current CHUNK_ROLES (description, application, implication)
+    # Combine prompt and history, expand via LLM. Optionally infer chunk roles from user input
+    # (prompt + context; uses current CHUNK_ROLES) - an independent LLM call, so run both concurrently.
     role_filter: list[str] | None = None
     if limit_chunk_role:
-        role_filter = _infer_chunk_roles(prompt, history)
+        role_filter, expanded = await asyncio.gather(
+            asyncio.to_thread(_infer_chunk_roles, prompt, history),
+            asyncio.to_thread(_expand_query, prompt, history),
+        )
         if not role_filter:
             role_filter = None
         else:
             logger.info("limit_chunk_role: inferred roles %s", role_filter)
-
-    # Combine prompt and history, expand via LLM
-    expanded = _expand_query(prompt, history)
+    else:
+        expanded = await asyncio.to_thread(_expand_query, prompt, history)
     logger.info("Query expansion: %s -> %s", prompt[:100], expanded[:100])
     
     # Embed the expanded query
     try:
-        query_emb = embed([expanded], group="_api")[0]
+        query_emb = await asyncio.to_thread(_embed_query, expanded)
     except Exception as e:
         logger.error("Embedding failed: %s", e)
         raise HTTPException(status_code=500, detail=f"Embedding failed: {e}")
     
     # Determine which groups to search
-    all_groups = _list_sync_groups()
-    if group and len(group) > 0:
-        missing = [g for g in group if g not in all_groups]
-        if missing:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Collection(s) not found: {missing}. Available: {all_groups}",
-            )
-        groups = list(group)
-    else:
-        groups = all_groups
+    groups = _resolve_groups(group)
 
     # Run retrieval (with optional role filter)
-    all_results = _run_retrieval(groups, query_emb, threshold, role_filter)
+    all_results = await asyncio.to_thread(_run_retrieval, groups, query_emb, threshold, role_filter)
 
     # If we filtered by role but got zero results, re-run retrieval without role filter (same embedding)
     role_filter_relaxed = False
@@ -512,11 +860,11 @@ def _do_query(
             "limit_chunk_role: no chunks matched inferred roles %s; retrying without role filter",
             role_filter,
         )
-        all_results = _run_retrieval(groups, query_emb, threshold, None)
+        all_results = await asyncio.to_thread(_run_retrieval, groups, query_emb, threshold, None)
         role_filter_relaxed = True
 
     # Enrich results with document summary and context numbering (1 of X, 2 of X per source)
-    all_results = _enrich_results_with_summary_and_context_index(all_results)
+    all_results = await asyncio.to_thread(_enrich_results_with_summary_and_context_index, all_results)
 
     # Group by document: each entry has document info + summary and samples (1 of X, 2 of X)
     documents = _group_results_by_document(all_results)
@@ -537,7 +885,9 @@ def _do_query(
         out["inferred_roles"] = role_filter
 
     if synthesize and all_results:
-        synthesis_text = _synthesize_rag_results(prompt, history, all_results, mode=synthesis_mode)
+        synthesis_text = await asyncio.to_thread(
+            _synthesize_rag_results, prompt, history, all_results, synthesis_mode
+        )
         out["synthesis"] = synthesis_text
         out["synthesis_mode"] = synthesis_mode
 
@@ -545,7 +895,7 @@ def _do_query(
 
 
 @app.get("/query")
-def query_rag_get(
+async def query_rag_get(
     prompt: str,
     history: str | None = None,
     threshold: float | None = Query(None, description="Minimum similarity (0.0–1.0). Omit to use RAGDOLL_QUERY_THRESHOLD or 0.45"),
@@ -567,11 +917,11 @@ def query_rag_get(
     - synthesis_mode: "instructions" or "answer".
     """
     use_threshold = threshold if threshold is not None else config.QUERY_THRESHOLD
-    return _do_query(prompt, history, use_threshold, group, limit_chunk_role, synthesize, synthesis_mode)
+    return await _do_query(prompt, history, use_threshold, group, limit_chunk_role, synthesize, synthesis_mode)
 
 
 @app.post("/query")
-def query_rag(request: QueryRequest) -> dict[str, Any]:
+async def query_rag(request: QueryRequest) -> dict[str, Any]:
     """Query RAG collections with semantic similarity search.
     
     Request body:
@@ -585,12 +935,46 @@ def query_rag(request: QueryRequest) -> dict[str, Any]:
     - synthesize: If true, LLM synthesizes prompt+history+RAG into instructions or answer.
     - synthesis_mode: "instructions" or "answer".
     """
-    return _do_query(
+    return await _do_query(
         request.prompt, request.history, request.threshold, request.group,
         request.limit_chunk_role, request.synthesize, request.synthesis_mode,
     )
 
 
+
+@app.post("/batch_query")
+async def batch_query_rag(request: BatchQueryRequest) -> dict[str, Any]:
+    """Run several retrieval queries in one request (e.g. sub-questions of a decomposed query).
+
+    Request body:
+    - prompts: List of queries (required). Each is embedded as-is (no LLM expansion); all are embedded
+               in one call and scored against each collection's chunks together.
+    - threshold: Minimum similarity score (default: 0.45)
+    - group: Optional list of collection names to query; if null or empty, searches all.
+
+    Returns one entry per prompt, in order, with the same results/documents/count fields as /query.
+    """
+    prompts = list(request.prompts)
+    groups = _resolve_groups(request.group)
+    if not prompts:
+        return {"threshold": request.threshold, "queries": []}
+    try:
+        query_embs = await asyncio.to_thread(_embed_queries, prompts)
+    except Exception as e:
+        logger.error("Embedding failed: %s", e)
+        raise HTTPException(status_code=500, detail=f"Embedding failed: {e}")
+    per_query = await asyncio.to_thread(_run_batch_retrieval, groups, query_embs, request.threshold)
+    queries: list[dict[str, Any]] = []
+    for prompt, results in zip(prompts, per_query):
+        results = await asyncio.to_thread(_enrich_results_with_summary_and_context_index, results)
+        queries.append({
+            "query": prompt,
+            "documents": _group_results_by_document(results),
+            "results": results,
+            "count": len(results),
+        })
+    return {"threshold": request.threshold, "queries": queries}
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=config.API_PORT)
@@ -1,27 +1,72 @@
 """Store chart images and table JSON under {group}/artifacts/. Embed only interpretations; keep raw here."""
 
-import json
+import hashlib
+import os
 import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
 from . import config
+from .fastjson import dumps_bytes
 
+_SAFE_STEM_RE = re.compile(r"[^\w\-.]")
 
+
+@lru_cache(maxsize=1024)
 def _safe_stem(s: str) -> str:
-    return re.sub(r"[^\w\-.]", "_", s)[:80]
+    return _SAFE_STEM_RE.sub("_", s)[:80]
+
+
+ARTIFACT_KINDS = ("charts", "figures", "tables")
+
+# Groups whose artifact subdirectories exist (created once per process, on the group's first artifact)
+_ready_groups: set[str] = set()
+
+
+def _ensure_subdirs(group: str) -> Path:
+    """Create all of {group}/artifacts/{charts,figures,tables} on first use; returns the artifacts dir."""
+    artifacts_dir = config.get_group_paths(group).artifacts_dir
+    if group not in _ready_groups:
+        for kind in ARTIFACT_KINDS:
+            (artifacts_dir / kind).mkdir(parents=True, exist_ok=True)
+        _ready_groups.add(group)
+    return artifacts_dir
+
+
+def _write_file(path: Path, data: bytes) -> None:
+    """Write data to path with one unbuffered open/write/close (artifacts are written once, never appended)."""
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+    try:
+        fd = os.open(path, flags, 0o644)
+    except FileNotFoundError:
+        # Directory removed since _ensure_subdirs created it
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(path, flags, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
 
 
 def store_chart_image(group: str, source_stem: str, page: int, idx: int, image_bytes: bytes, ext: str = "png") -> str:
-    """Save chart image to {group}/artifacts/charts/{stem}_p{page}_{idx}.{ext}. Returns absolute path."""
-    gp = config.get_group_paths(group)
-    d = gp.artifacts_dir / "charts"
-    d.mkdir(parents=True, exist_ok=True)
+    """
+    Save chart image to {group}/artifacts/charts/{stem}_{hash}.{ext}, named by a hash of the image bytes so
+    an image repeated within a document (logos, headers) or re-ingested is stored once. Returns absolute path.
+    page and idx are kept in the signature for callers; the chunk row records the page.
+    """
+    d = _ensure_subdirs(group) / "charts"
     stem = _safe_stem(source_stem)
     ext = (ext or "png").lstrip(".")
     if ext.lower() not in {"png", "jpg", "jpeg", "gif", "bmp", "tiff"}:
         ext = "png"
-    p = d / f"{stem}_p{page}_{idx}.{ext}"
-    p.write_bytes(image_bytes)
+    digest = hashlib.blake2b(image_bytes, digest_size=8).hexdigest()
+    p = d / f"{stem}_{digest}.{ext}"
+    if not p.exists():
+        _write_file(p, image_bytes)
     return str(p)
 
 
@@ -30,27 +75,50 @@ def store_figure(
     image_bytes: bytes, process_dict: dict, ocr_text: str,
 ) -> str:
     """Save figure image and process JSON to {group}/artifacts/figures/. Returns path to the JSON."""
-    gp = config.get_group_paths(group)
-    d = gp.artifacts_dir / "figures"
-    d.mkdir(parents=True, exist_ok=True)
+    d = _ensure_subdirs(group) / "figures"
     stem = _safe_stem(source_stem)
     base = f"{stem}_p{page}_{idx}"
-    (d / f"{base}.png").write_bytes(image_bytes)
+    _write_file(d / f"{base}.png", image_bytes)
     j = d / f"{base}.json"
-    j.write_text(
-        json.dumps({"process": process_dict, "ocr": ocr_text}, ensure_ascii=False, indent=0),
-        encoding="utf-8",
-    )
+    _write_file(j, dumps_bytes({"process": process_dict, "ocr": ocr_text}))
     return str(j)
 
 
 def store_table(group: str, source_stem: str, page: int | None, idx: int, data: list[list[str]]) -> str:
     """Save table as JSON to {group}/artifacts/tables/{stem}_p{page}_{idx}.json. Returns absolute path. page can be 0 when unknown."""
-    gp = config.get_group_paths(group)
-    d = gp.artifacts_dir / "tables"
-    d.mkdir(parents=True, exist_ok=True)
+    d = _ensure_subdirs(group) / "tables"
     stem = _safe_stem(source_stem)
     pp = f"p{page}" if page is not None else "p0"
     p = d / f"{stem}_{pp}_{idx}.json"
-    p.write_text(json.dumps(data, ensure_ascii=False, indent=0), encoding="utf-8")
+    _write_file(p, dumps_bytes(data))
     return str(p)
+
+
+# Background writers for image artifacts, so extraction can go on while large images are written
+ARTIFACT_WRITER_THREADS = 4
+_writer_pool: ThreadPoolExecutor | None = None
+_writer_pool_lock = threading.Lock()
+
+
+def _writers() -> ThreadPoolExecutor:
+    global _writer_pool
+    if _writer_pool is None:
+        with _writer_pool_lock:
+            if _writer_pool is None:
+                _writer_pool = ThreadPoolExecutor(max_workers=ARTIFACT_WRITER_THREADS, thread_name_prefix="artifact-writer")
+    return _writer_pool
+
+
+def store_chart_image_async(
+    group: str, source_stem: str, page: int, idx: int, image_bytes: bytes, ext: str = "png"
+) -> "Future[str]":
+    """store_chart_image on a background writer thread. The future's result is the path (or the write error)."""
+    return _writers().submit(store_chart_image, group, source_stem, page, idx, image_bytes, ext)
+
+
+def store_figure_async(
+    group: str, source_stem: str, page: int, idx: int,
+    image_bytes: bytes, process_dict: dict, ocr_text: str,
+) -> "Future[str]":
+    """store_figure on a background writer thread. The future's result is the JSON path (or the write error)."""
+    return _writers().submit(store_figure, group, source_stem, page, idx, image_bytes, process_dict, ocr_text)
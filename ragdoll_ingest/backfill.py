@@ -0,0 +1,297 @@
+"""
+Backfill one-sentence document summaries onto existing RAG samples, plus the shared
+helpers for stripping trailing "[SUMMARY of filename: ...]" blocks from chunk text.
+
+Iterates over all collections (groups), then over each source in the collection's
+DB. For each source, builds document text from chunk bodies, calls the LLM for
+a short summary, then appends "[SUMMARY of filename: ...]" to each chunk.
+Summaries for a collection run concurrently (up to RAGDOLL_OLLAMA_NUM_PARALLEL
+in flight). Updated chunks are re-embedded in batches that span sources (see
+EMBED_BATCH_MAX_TEXTS / EMBED_BATCH_MAX_TOKENS).
+
+Entry point: backfill_doc_summaries.py in the project root (see main() for options).
+"""
+
+import argparse
+import asyncio
+import hashlib
+import logging
+import re
+from array import array
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple, Sequence
+
+from . import config
+from .embedder import embed_many
+from .interpreters import DOC_SUMMARY_MAX_CHARS, summarize_document_async
+from .storage import (
+    _connect,
+    _list_sync_groups,
+    init_db,
+    iter_chunk_texts_for_source,
+    list_sources,
+    update_chunk_texts,
+)
+
+logger = logging.getLogger(__name__)
+
+
+_MARKER = "[SUMMARY of "
+_MARKER_RE = re.compile(re.escape(_MARKER), re.IGNORECASE)
+
+
+@lru_cache(maxsize=4096)
+def strip_all_trailing_summaries(text: str) -> str:
+    """
+    Remove all trailing '[SUMMARY of ...]' blocks (one or many). Returns body only.
+    Blocks are stripped one at a time from the end: the last marker goes, with everything after
+    it, as long as a ']' follows it. Markers are found in one scan, so k blocks cost O(len + k).
+    Cached: the backfill strips each chunk once per pass over a source.
+    """
+    if not text or not text.strip():
+        return text
+    current = text.strip()
+    starts = [m.start() for m in _MARKER_RE.finditer(current)]
+    end = len(current)
+    while starts:
+        idx = starts.pop()
+        if idx + len(_MARKER) > end:
+            continue  # marker's trailing space was stripped along with a later block
+        if current.rfind("]", idx, end) < 0:
+            break
+        end = idx
+        while end and current[end - 1].isspace():
+            end -= 1
+    return current[:end]
+
+
+def chunk_body_only(text: str) -> str:
+    """Return chunk body with all trailing [SUMMARY of ...] stripped ("" for blank text)."""
+    return strip_all_trailing_summaries(text or "").strip()
+
+
+# Embed requests are flushed once either budget is reached, so the embedder sees a
+# few large batches spanning many sources instead of one small request per source.
+EMBED_BATCH_MAX_TEXTS = 256
+EMBED_BATCH_MAX_TOKENS = 16_000
+CHARS_PER_TOKEN = 4
+# Embeddings remembered per collection so repeated texts (e.g. boilerplate) are embedded once
+EMBED_MEMO_MAX = 4096
+
+
+class SourceScan(NamedTuple):
+    """Result of the first (streaming) pass over one source's chunks."""
+
+    document_text: str  # stripped bodies joined, capped just past DOC_SUMMARY_MAX_CHARS
+    needs_update: bool  # do over, or at least one chunk without a trailing summary
+    num_chunks: int
+
+
+def scan_source(conn, source_id: int, do_over: bool) -> SourceScan:
+    """
+    Stream one source's chunks once, keeping only what is needed to summarize it:
+    the document text (stopped once past DOC_SUMMARY_MAX_CHARS, since
+    summarize_document truncates there anyway) and whether any chunk lacks a summary.
+    """
+    parts: list[str] = []
+    size = 0
+    needs_update = do_over
+    n = 0
+    for _chunk_id, text in iter_chunk_texts_for_source(conn, source_id):
+        n += 1
+        body = chunk_body_only(text)
+        if body and size <= DOC_SUMMARY_MAX_CHARS:
+            parts.append(body)
+            size += len(body) + 2
+        if not needs_update and body == text.strip():
+            needs_update = True
+    return SourceScan("\n\n".join(parts), needs_update, n)
+
+
+def rows_with_summary(
+    conn, source_id: int, filename: str, summary: str, do_over: bool
+) -> list[tuple[int, str]]:
+    """
+    Second pass over one source's chunks: (chunk_id, new_text) for each chunk that
+    gets the bracketed summary appended (all chunks in do over mode, only chunks
+    without one in continue mode).
+    """
+    suffix = f"\n\n[SUMMARY of {filename}: {summary}]"  # built once, shared by every chunk of the source
+    rows: list[tuple[int, str]] = []
+    for chunk_id, text in iter_chunk_texts_for_source(conn, source_id):
+        body = chunk_body_only(text)
+        if do_over:
+            # Strip trailing summary, append new one
+            rows.append((chunk_id, (body or text) + suffix))
+        elif body == text.strip():
+            # Continue: only chunks that don't already have trailing summary
+            rows.append((chunk_id, text + suffix))
+    return rows
+
+
+async def _summarize_all(group: str, docs: list[tuple[str, str]], max_parallel: int) -> list[str]:
+    """Summarize (document_text, filename) pairs concurrently, at most max_parallel at a time."""
+    sem = asyncio.Semaphore(max_parallel)
+    return await asyncio.gather(
+        *(summarize_document_async(text, group=group, filename=filename, semaphore=sem) for text, filename in docs)
+    )
+
+
+def flush_updates(
+    conn, group: str, pending: list[tuple[int, str]], memo: dict[bytes, Sequence[float]] | None = None
+) -> int:
+    """
+    Embed all pending (chunk_id, new_text) rows via embed_many and write them in a
+    single transaction. Returns number of chunks updated (0 on embed failure).
+    memo (blake2b(text) -> embedding) carries vectors across flushes, so identical
+    texts anywhere in the run are embedded once; embed_many dedupes within a flush.
+    """
+    if not pending:
+        return 0
+    memo = {} if memo is None else memo
+    keys = [hashlib.blake2b(t.encode("utf-8"), digest_size=16).digest() for _, t in pending]
+    missing = {k: t for k, (_, t) in zip(keys, pending) if k not in memo}
+    if missing:
+        try:
+            embs = embed_many(list(missing.values()), group=group)
+        except Exception as e:
+            logger.warning("  [%s] embed failed for %d chunk(s): %s", group, len(pending), e)
+            return 0
+        if len(embs) != len(missing):
+            logger.warning("  [%s] embed count mismatch (%d texts, %d embeddings)", group, len(missing), len(embs))
+            return 0
+        if len(memo) + len(missing) > EMBED_MEMO_MAX:
+            memo.clear()
+        memo.update((k, array("f", e)) for k, e in zip(missing, embs))  # float32: ~4 bytes per dim
+    return update_chunk_texts(conn, [(chunk_id, new_text, memo[k]) for (chunk_id, new_text), k in zip(pending, keys)])
+
+
+def backfill_group(conn, group: str, do_over: bool, max_parallel: int | None = None) -> tuple[int, int]:
+    """
+    Summarize every source in one collection (up to max_parallel LLM calls at once,
+    default OLLAMA_NUM_PARALLEL), then embed the updated chunks in token-budgeted
+    batches that span sources. In continue mode, sources whose chunks all carry a
+    summary are skipped without an LLM call.
+    Returns (sources updated, chunks updated).
+    """
+    init_db(conn)
+    sources = list_sources(conn)
+    if not sources:
+        logger.info("[%s] no sources", group)
+        return 0, 0
+    logger.info("[%s] %d source(s)", group, len(sources))
+    pending: list[tuple[int, str]] = []
+    pending_sources: list[tuple[str, int]] = []
+    pending_tokens = 0
+    memo: dict[bytes, Sequence[float]] = {}
+    total_sources = 0
+    total_chunks = 0
+
+    def _flush() -> None:
+        nonlocal pending, pending_sources, pending_tokens, total_sources, total_chunks
+        if flush_updates(conn, group, pending, memo):
+            for source_path, n in pending_sources:
+                logger.info("  [%s] %s -> %d chunks updated", group, source_path, n)
+            total_sources += len(pending_sources)
+            total_chunks += len(pending)
+        pending, pending_sources, pending_tokens = [], [], 0
+
+    # First pass streams every source's chunks (SQLite stays on this thread) and keeps
+    # only the capped document text; the per-source summary LLM calls then run concurrently.
+    docs: list[tuple[int, str, str, SourceScan]] = []
+    for source_id, source_path, *_ in sources:
+        scan = scan_source(conn, source_id, do_over)
+        if not scan.num_chunks or not scan.needs_update:
+            continue
+        if not scan.document_text:
+            logger.warning("  [%s] source_id=%s no usable text, skipping", group, source_id)
+            continue
+        docs.append((source_id, source_path, Path(source_path).name, scan))
+    summaries = asyncio.run(
+        _summarize_all(
+            group,
+            [(scan.document_text, filename) for _, _, filename, scan in docs],
+            max_parallel or config.OLLAMA_NUM_PARALLEL,
+        )
+    )
+
+    # Second pass re-reads each summarized source to build its updated chunk texts
+    for (source_id, source_path, filename, scan), summary in zip(docs, summaries):
+        if not summary:
+            logger.warning("  [%s] source_id=%s summary failed, skipping", group, source_id)
+            continue
+        rows = rows_with_summary(conn, source_id, filename, summary, do_over)
+        if not rows:
+            continue
+        pending.extend(rows)
+        pending_sources.append((source_path, len(rows)))
+        pending_tokens += sum(len(t) for _, t in rows) // CHARS_PER_TOKEN
+        if len(pending) >= EMBED_BATCH_MAX_TEXTS or pending_tokens >= EMBED_BATCH_MAX_TOKENS:
+            _flush()
+    _flush()
+    return total_sources, total_chunks
+
+
+def _process_group(group: str, do_over: bool, max_parallel: int) -> tuple[int, int]:
+    """Backfill one collection on its own connection (runs in a worker thread)."""
+    conn = _connect(group)
+    try:
+        return backfill_group(conn, group, do_over, max_parallel)
+    finally:
+        conn.close()
+
+
+def main(argv: list[str] | None = None) -> None:
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    parser = argparse.ArgumentParser(description="Backfill one-sentence document summaries onto existing RAG samples.")
+    parser.add_argument(
+        "--mode",
+        choices=["do-over", "continue"],
+        default="continue",
+        help="do-over: strip existing [SUMMARY of ...] and redo every chunk; continue: only chunks without one (default)",
+    )
+    parser.add_argument("--groups", nargs="*", metavar="GROUP", help="Only these collections (default: all)")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Collections processed in parallel (default: RAGDOLL_OLLAMA_NUM_PARALLEL)",
+    )
+    args = parser.parse_args(argv)
+    do_over = args.mode == "do-over"
+    logger.info("Mode: %s", "do over" if do_over else "continue")
+
+    if args.groups:
+        # Only look at the requested collections' DBs
+        groups = [g for g in args.groups if config.get_group_paths(g).rag_db_path.exists()]
+        missing = sorted(set(args.groups) - set(groups))
+        if missing:
+            logger.warning("No ragdoll.db for collection(s): %s", missing)
+    else:
+        groups = _list_sync_groups()
+    if not groups:
+        logger.info("No collections found (no ragdoll.db under DATA_DIR).")
+        return
+    logger.info("Collections: %s", groups)
+    # Collections are independent DB files, so run them in parallel. Split the Ollama
+    # parallelism between them so the total number of in-flight summaries stays bounded.
+    workers = max(1, min(len(groups), args.workers or config.OLLAMA_NUM_PARALLEL))
+    per_group_parallel = max(1, config.OLLAMA_NUM_PARALLEL // workers)
+    total_sources = 0
+    total_chunks = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(_process_group, group, do_over, per_group_parallel): group for group in sorted(groups)
+        }
+        for fut in as_completed(futures):
+            try:
+                n_sources, n_chunks = fut.result()
+            except Exception as e:
+                logger.error("[%s] backfill failed: %s", futures[fut], e)
+                continue
+            total_sources += n_sources
+            total_chunks += n_chunks
+    logger.info("Done: %d sources, %d chunks updated across all collections.", total_sources, total_chunks)
+
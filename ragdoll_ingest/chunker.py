@@ -1,12 +1,20 @@
 """Semantic chunking with LLM-assisted splitting for long paragraphs."""
 
+import hashlib
 import json
 import logging
+import os
 import re
-from typing import Any
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Iterator
 
-from . import config
+import requests
+
+from . import config, ollama
 from .action_log import log as action_log
+from .fastjson import dumps_bytes, loads
 
 logger = logging.getLogger(__name__)
 
@@ -16,30 +24,65 @@ CHARS_PER_TOKEN = 4
 # Max characters to send to LLM in one request for semantic boundary detection (leave room for prompt + response)
 SEMANTIC_CHUNK_WINDOW = 10000
 
+# Patterns compiled once at import (used per block / per LLM response)
+_MD_LINK_RE = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_URL_RE = re.compile(r"https?://\S+")
+_BOLD_STAR_RE = re.compile(r"\*\*([^*]+)\*\*")
+_BOLD_UNDERSCORE_RE = re.compile(r"__([^_]+)__")
+_ITALIC_STAR_RE = re.compile(r"\*([^*]+)\*")
+# Same as (?<!\w)_([^_]+)_(?!\w), written to start with the literal "_" so the regex engine can skip ahead to it
+_ITALIC_UNDERSCORE_RE = re.compile(r"_(?<!\w_)([^_]+)_(?!\w)")
+# Same as (?m)^#+\s*, literal-first for the same reason: a "#" not preceded by anything but a newline
+_HEADER_PREFIX_RE = re.compile(r"#(?<![^\n]#)#*\s*")
+# Runs of 2+ spaces (tabs are turned into spaces first), so single spaces between words are not rewritten.
+# Spelled as two literal spaces rather than " {2,}" so the engine searches for the pair instead of trying every space.
+_HSPACE_RE = re.compile(r"  +")
+_CRLF_RE = re.compile(r"\r\n?")
+_BLANK_LINES_RE = re.compile(r"\n\s*\n\s*\n+")
+_CODEBLOCK_RE = re.compile(r"```(?:json)?\s*([\s\S]*?)```")
+_HEADER_RE = re.compile(r"^#+\s*\S")
+_BLOCK_SPLIT_RE = re.compile(r"\n\s*\n")
+
 
 def _clean_for_chunking(text: str) -> str:
     """Strip non-meaning-bearing characters: links, markdown formatting, normalize whitespace. Keeps substantive text."""
     if not text or not text.strip():
         return ""
+    # Each pass is skipped when the text lacks the character(s) it needs to match (plain text skips
+    # all the markdown passes); a substring test is a fast C scan, much cheaper than running the regex
     # Replace markdown links [text](url) with just the link text
-    text = re.sub(r"\[([^\]]*)\]\([^)]*\)", r"\1", text)
+    if "](" in text:
+        text = _MD_LINK_RE.sub(r"\1", text)
     # Remove bare URLs (http/https)
-    text = re.sub(r"https?://\S+", " ", text)
+    if "://" in text:
+        text = _URL_RE.sub(" ", text)
     # Remove **bold** and __bold__ (keep inner text)
-    text = re.sub(r"\*\*([^*]+)\*\*", r"\1", text)
-    text = re.sub(r"__([^_]+)__", r"\1", text)
+    if "*" in text:
+        text = _BOLD_STAR_RE.sub(r"\1", text)
+    if "__" in text:
+        text = _BOLD_UNDERSCORE_RE.sub(r"\1", text)
     # Remove *italic* and _italic_ (keep inner text; avoid breaking mid-word)
-    text = re.sub(r"\*([^*]+)\*", r"\1", text)
-    text = re.sub(r"(?<!\w)_([^_]+)_(?!\w)", r"\1", text)
+    if "*" in text:
+        text = _ITALIC_STAR_RE.sub(r"\1", text)
+    if "_" in text:
+        text = _ITALIC_UNDERSCORE_RE.sub(r"\1", text)
     # Remove # at start of line (markdown headers) but keep the rest of the line
-    text = re.sub(r"^#+\s*", "", text, flags=re.MULTILINE)
+    if "#" in text:
+        text = _HEADER_PREFIX_RE.sub("", text)
     # Normalize whitespace: collapse multiple spaces, normalize newlines to \n
-    text = re.sub(r"[ \t]+", " ", text)
-    text = re.sub(r"\r\n?", "\n", text)
-    text = re.sub(r"\n\s*\n\s*\n+", "\n\n", text)
+    text = text.replace("\t", " ")
+    if "  " in text:
+        text = _HSPACE_RE.sub(" ", text)
+    if "\r" in text:
+        text = _CRLF_RE.sub("\n", text)
+    text = _BLANK_LINES_RE.sub("\n\n", text)
     return text.strip()
 
 
+# Sentence end followed by whitespace: the boundaries _snap_to_boundaries looks for besides newlines
+_SENTENCE_BREAKS = tuple(p + w for p in ".!?" for w in " \t\n")
+
+
 def _snap_to_boundaries(text: str, start: int, end: int) -> tuple[int, int]:
     """Snap start/end to paragraph or sentence boundaries so we don't cut mid-sentence."""
     n = len(text)
@@ -47,44 +90,67 @@ def _snap_to_boundaries(text: str, start: int, end: int) -> tuple[int, int]:
         return 0, 0
     start = max(0, min(start, n - 1))
     end = max(start, min(end, n))
-    # Snap start backward to paragraph start (\n\n) or sentence start (after . or \n)
-    for i in range(start, -1, -1):
-        if i == 0:
-            break
-        if i >= 2 and text[i - 2 : i] == "\n\n":
-            start = i
-            break
-        if i >= 2 and text[i - 1] in " \t" and text[i - 2] in ".!?":
-            start = i
-            break
-        if text[i - 1] == "\n":
-            start = i
-            break
-    else:
-        start = 0
-    # Snap end forward to paragraph end or sentence end
-    for i in range(end, n + 1):
-        if i >= n:
-            end = n
-            break
-        if i <= n - 2 and text[i : i + 2] == "\n\n":
-            end = i + 2
-            break
-        if i < n and text[i] in ".!?" and (i + 1 >= n or text[i + 1] in " \t\n"):
-            end = i + 1
-            break
-        if i < n and text[i] == "\n":
-            end = i + 1
-            break
-    else:
+    # Snap start backward to the nearest line start (after \n) or sentence start (after ". ", "!\t", ...)
+    best = text.rfind("\n", 0, start) + 1
+    for sep in _SENTENCE_BREAKS:
+        if sep[1] != "\n":
+            j = text.rfind(sep, 0, start)
+            if j != -1:
+                best = max(best, j + 2)
+    if best > 0:
+        start = best
+    # Snap end forward to the nearest line end (past a blank line if one follows) or sentence end
+    i = text.find("\n", end)
+    if i == -1:
+        i = n
+    for sep in _SENTENCE_BREAKS:
+        j = text.find(sep, end, i + 1)
+        if j != -1:
+            i = j
+    if i == n and n - 1 >= end and text[n - 1] in ".!?":
+        i = n - 1
+    if i >= n:
         end = n
+    elif text[i] == "\n":
+        end = i + 2 if text.startswith("\n", i + 1) else i + 1
+    else:
+        end = i + 1
     return start, end
 
 
+_NONSPACE_RE = re.compile(r"\S")
+
+
+def _locate_chunks(chunks: list[str], window_text: str, window_offset: int) -> list[tuple[str, int]]:
+    """Pair each chunk with its start_offset (for page mapping) by locating it in window_text, in order."""
+    out: list[tuple[str, int]] = []
+    search_start = 0
+    for chunk_str in chunks:
+        # Chunks are usually copied verbatim and in order, so the next one normally starts right after the
+        # whitespace following the previous one: check there first and only scan forward on a mismatch
+        m = _NONSPACE_RE.search(window_text, search_start)
+        if m and window_text.startswith(chunk_str, m.start()):
+            idx = m.start()
+        else:
+            idx = window_text.find(chunk_str, search_start)
+        if idx >= 0:
+            start_offset = window_offset + idx
+            search_start = idx + len(chunk_str)
+        else:
+            start_offset = window_offset + search_start
+        out.append((chunk_str, start_offset))
+    return out
+
+
 def _get_semantic_chunk_texts_one(
     window_text: str, ollama_url: str, group: str = "_root", window_offset: int = 0
 ) -> list[tuple[str, int]]:
     """Ask LLM for semantic chunks as text. Returns list of (chunk_text, start_offset) by locating each chunk in window_text."""
+    cache_path = _split_cache_path(window_text, group, kind="semantic")
+    cached = _split_cache_get(cache_path)
+    if cached is not None:
+        return _locate_chunks(cached, window_text, window_offset)
+
     prompt = (
         "Split the following text into coherent semantic chunks. Prefer longer, self-contained sections. "
         "Rules: "
@@ -101,48 +167,32 @@ def _get_semantic_chunk_texts_one(
     ) + window_text
 
     try:
-        import requests
-
-        r = requests.post(
-            f"{ollama_url.rstrip('/')}/api/generate",
-            json={
+        resp = ollama.generate_text(
+            ollama_url,
+            {
                 "model": config.CHUNK_MODEL,
                 "prompt": prompt,
-                "stream": False,
                 "format": "json",
+                "keep_alive": config.OLLAMA_KEEP_ALIVE,
             },
-            timeout=config.CHUNK_LLM_TIMEOUT,
-        )
-        r.raise_for_status()
-        resp = (r.json().get("response") or "").strip()
+            config.CHUNK_LLM_TIMEOUT,
+            stop_after_json=True,
+        ).strip()
         if not resp:
             return []
         if "```" in resp:
-            m = re.search(r"```(?:json)?\s*([\s\S]*?)```", resp)
+            m = _CODEBLOCK_RE.search(resp)
             if m:
                 resp = m.group(1).strip()
-        obj: dict[str, Any] = json.loads(resp)
+        obj: dict[str, Any] = loads(resp)
         chunks_raw = obj.get("chunks")
         if not isinstance(chunks_raw, list):
             return []
-        out: list[tuple[str, int]] = []
-        search_start = 0
-        for item in chunks_raw:
-            if not isinstance(item, str):
-                continue
-            chunk_str = item.strip()
-            if not chunk_str:
-                continue
-            # Locate this chunk in the window text (from search_start) to get start_offset for page mapping
-            idx = window_text.find(chunk_str, search_start)
-            if idx >= 0:
-                start_offset = window_offset + idx
-                search_start = idx + len(chunk_str)
-            else:
-                start_offset = window_offset + search_start
-            out.append((chunk_str, start_offset))
-        if not out:
+        chunks = [item.strip() for item in chunks_raw if isinstance(item, str) and item.strip()]
+        if not chunks:
             return []
+        _split_cache_put(cache_path, chunks)
+        out = _locate_chunks(chunks, window_text, window_offset)
         action_log(
             "chunk_semantic",
             model=config.CHUNK_MODEL,
@@ -170,25 +220,30 @@ def _get_semantic_chunk_texts(
         return []
     if len(full_text) <= SEMANTIC_CHUNK_WINDOW:
         return _get_semantic_chunk_texts_one(full_text, ollama_url, group, window_offset=0)
-    all_chunks: list[tuple[str, int]] = []
+    # Window boundaries depend only on the text, so cut them all first, then send the windows concurrently
+    windows: list[tuple[str, int]] = []
     offset = 0
     while offset < len(full_text):
         window_end = min(offset + SEMANTIC_CHUNK_WINDOW, len(full_text))
         # Prefer to break at last paragraph boundary so we don't cut mid-section (e.g. heading from bullets)
         break_at = window_end
         if window_end < len(full_text):
-            search_region = full_text[offset:window_end]
-            last_pp = search_region.rfind("\n\n")
-            if last_pp >= _SEMANTIC_WINDOW_MIN:
-                break_at = offset + last_pp
+            # Search in place (no slice of the window); a break closer than _SEMANTIC_WINDOW_MIN is not taken
+            last_pp = full_text.rfind("\n\n", offset + _SEMANTIC_WINDOW_MIN, window_end)
+            if last_pp != -1:
+                break_at = last_pp
         window = full_text[offset:break_at]
-        if not window.strip():
-            offset = break_at
-            continue
-        part = _get_semantic_chunk_texts_one(window, ollama_url, group, window_offset=offset)
-        all_chunks.extend(part)
+        if window.strip():
+            windows.append((window, offset))
         offset = break_at
-    return all_chunks
+    if len(windows) <= 1:
+        parts = [_get_semantic_chunk_texts_one(w, ollama_url, group, window_offset=off) for w, off in windows]
+    else:
+        with ThreadPoolExecutor(max_workers=min(config.OLLAMA_NUM_PARALLEL, len(windows))) as pool:
+            parts = list(pool.map(
+                lambda w: _get_semantic_chunk_texts_one(w[0], ollama_url, group, window_offset=w[1]), windows
+            ))
+    return [chunk for part in parts for chunk in part]
 
 
 def chunk_text_semantic(
@@ -206,6 +261,9 @@ def chunk_text_semantic(
     cleaned = full_text if pre_cleaned else _clean_for_chunking(full_text)
     if not cleaned.strip():
         return []
+    # A document within one target-sized chunk stays whole: no LLM call needed
+    if _tokens_approx(cleaned) <= config.TARGET_CHUNK_TOKENS:
+        return [(cleaned, 0)]
     result = _get_semantic_chunk_texts(cleaned, url, group)
     if not result:
         # Fallback: one chunk if short enough, else legacy chunk_text
@@ -219,76 +277,161 @@ def chunk_text_semantic(
 
 
 def _tokens_approx(text: str) -> int:
-    return max(1, len(text) // CHARS_PER_TOKEN)
+    return len(text) // CHARS_PER_TOKEN or 1
+
+
+# Common section titles (lowercase) that stay with the following block
+_SECTION_TITLES = frozenset({
+    "key terms", "overview", "summary", "introduction", "background",
+    "key concepts", "key points", "glossary", "definitions", "references",
+})
+_SENTENCE_PUNCT_RE = re.compile(r"[.!?]")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
 
 
 def _looks_like_section_header(block: str) -> bool:
-    """True if block is a short title/header that should stay with the following content."""
-    block = block.strip()
-    if not block:
+    """True if block (already stripped) is a short title/header that should stay with the following content."""
+    # Blocks have no blank lines (_iter_blocks splits on them), so 3+ lines can never be a header
+    if not block or block.count("\n") > 1:
         return False
-    lines = [ln.strip() for ln in block.splitlines() if ln.strip()]
+    if block.isprintable():
+        # No line breaks of any kind (the common case): block is the one line, no list to build
+        line = block
+    else:
+        lines = [ln for ln in map(str.strip, block.splitlines()) if ln]
+        if len(lines) != 1:
+            # Two short lines (e.g. "Key Terms" + subtitle)
+            return len(lines) == 2 and all(len(ln) <= 60 for ln in lines)
+        line = lines[0]
     # Markdown-style header (## Key Terms or # Overview)
-    if len(lines) == 1 and re.match(r"^#+\s*\S", lines[0]):
+    if _HEADER_RE.match(line):
         return True
     # Single line, short (e.g. "Key Terms", "Overview")
-    if len(lines) == 1 and len(lines[0]) <= 80:
-        line = lines[0]
+    if len(line) <= 80:
         if line.endswith(":"):
             return True
         # Common section titles (case-insensitive)
-        if line.lower() in (
-            "key terms", "overview", "summary", "introduction", "background",
-            "key concepts", "key points", "glossary", "definitions", "references",
-        ):
+        if line.lower() in _SECTION_TITLES:
             return True
         # Short line that looks like a title (no sentence-ending punctuation)
-        if len(line) <= 60 and "." not in line and "!" not in line and "?" not in line:
+        if len(line) <= 60 and not _SENTENCE_PUNCT_RE.search(line):
             return True
-    # Two short lines (e.g. "Key Terms" + blank or subtitle)
-    if len(lines) == 2 and all(len(ln) <= 60 for ln in lines):
-        return True
     return False
 
 
-def _merge_header_blocks(blocks: list[str]) -> list[str]:
-    """Merge header-like blocks with the next block so section headers stay with their content."""
-    if not blocks:
-        return []
-    out: list[str] = []
-    i = 0
-    while i < len(blocks):
-        b = blocks[i]
-        if _looks_like_section_header(b) and i + 1 < len(blocks):
-            # Merge header with next block
-            out.append(b.strip() + "\n\n" + blocks[i + 1].strip())
-            i += 2
-            continue
-        out.append(b)
-        i += 1
-    return out
-
-
-def _split_blocks(text: str) -> list[str]:
-    """Split into paragraphs/blocks (by double newline or single when very long)."""
-    text = text.strip()
-    if not text:
-        return []
-    blocks = re.split(r"\n\s*\n", text)
-    out: list[str] = []
-    for b in blocks:
+def _iter_blocks(text: str) -> Iterator[tuple[str, int]]:
+    """
+    Split into paragraphs/blocks (by double newline, or by single newline when a block is very long)
+    and merge header-like blocks with the next block so section headers stay with their content.
+    Yields (block, approx tokens) in one pass over the text.
+    """
+    header: str | None = None  # header block waiting for the block that follows it
+    for b in _BLOCK_SPLIT_RE.split(text):
         b = b.strip()
         if not b:
             continue
+        tokens = _tokens_approx(b)
         # If a block is huge, split by single newlines into smaller pieces
-        if _tokens_approx(b) > config.MAX_CHUNK_TOKENS * 2:
-            for line in b.split("\n"):
-                line = line.strip()
-                if line:
-                    out.append(line)
+        if tokens > config.MAX_CHUNK_TOKENS * 2:
+            pieces = ((line, len(line) // CHARS_PER_TOKEN or 1) for line in map(str.strip, b.split("\n")) if line)
         else:
-            out.append(b)
-    return _merge_header_blocks(out)
+            pieces = ((b, tokens),)
+        for piece, piece_tokens in pieces:
+            if header is not None:
+                # Merge header with next block (both already stripped)
+                merged = header + "\n\n" + piece
+                header = None
+                yield merged, _tokens_approx(merged)
+            elif _looks_like_section_header(piece):
+                header = piece
+            else:
+                yield piece, piece_tokens
+    if header is not None:
+        yield header, _tokens_approx(header)
+
+
+# On-disk cache of LLM split results per group ({group}/artifacts/.chunk_cache/{key}.json), so re-ingesting
+# a document does not repeat its LLM calls. Least recently used entries (by mtime) are evicted past the cap.
+SPLIT_CACHE_SUBDIR = ".chunk_cache"
+SPLIT_CACHE_MAX_ENTRIES = 10_000
+# Writes between checks of the entry count
+_SPLIT_CACHE_EVICT_EVERY = 200
+_split_cache_writes = 0
+
+
+def _split_cache_path(text: str, group: str, kind: str = "split") -> Path:
+    """
+    Cache file for an LLM chunking of text. kind names the prompt ("split" for long paragraphs,
+    "semantic" for semantic-chunking windows); the key covers it and the model so either change misses.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(config.CHUNK_MODEL.encode("utf-8"))
+    h.update(b"\0")
+    h.update(kind.encode("utf-8"))
+    h.update(b"\0")
+    h.update(text.encode("utf-8"))
+    return config.get_group_paths(group).artifacts_dir / SPLIT_CACHE_SUBDIR / f"{h.hexdigest()}.json"
+
+
+def _split_cache_get(path: Path) -> list[str] | None:
+    try:
+        chunks = loads(path.read_bytes())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring unreadable split cache entry %s: %s", path.name, e)
+        return None
+    if not (isinstance(chunks, list) and chunks and all(isinstance(c, str) for c in chunks)):
+        return None
+    try:
+        os.utime(path)  # mark as recently used for eviction
+    except OSError:
+        pass
+    return chunks
+
+
+def _split_cache_put(path: Path, chunks: list[str]) -> None:
+    global _split_cache_writes
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(dumps_bytes(chunks))
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning("Could not write split cache entry %s: %s", path.name, e)
+        return
+    _split_cache_writes += 1
+    if _split_cache_writes % _SPLIT_CACHE_EVICT_EVERY == 0:
+        _evict_split_cache(path.parent)
+
+
+def _evict_split_cache(cache_dir: Path) -> None:
+    """Delete the least recently used entries beyond SPLIT_CACHE_MAX_ENTRIES."""
+    try:
+        entries = [(e.stat().st_mtime_ns, e.path) for e in os.scandir(cache_dir) if e.name.endswith(".json")]
+    except OSError:
+        return
+    if len(entries) <= SPLIT_CACHE_MAX_ENTRIES:
+        return
+    entries.sort()
+    for _mtime, entry_path in entries[: len(entries) - SPLIT_CACHE_MAX_ENTRIES]:
+        try:
+            os.unlink(entry_path)
+        except OSError:
+            pass
+
+
+# Structured output for _llm_split_long: Ollama constrains decoding to this JSON schema
+_SPLIT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "chunks": {"type": "array", "items": {"type": "string"}, "minItems": 2, "maxItems": 3},
+    },
+    "required": ["chunks"],
+}
+# Ollama before 0.5 types "format" as a string and rejects a schema with HTTP 400. Cleared the
+# first time "json" succeeds after such a rejection, so later splits go straight to "json".
+_split_schema_ok = True
 
 
 def _llm_split_long(text: str, ollama_url: str, group: str = "_root") -> list[str]:
@@ -300,6 +443,12 @@ def _llm_split_long(text: str, ollama_url: str, group: str = "_root") -> list[st
     if len(text) > max_in:
         text = text[:max_in] + "\n[...truncated...]"
 
+    cache_path = _split_cache_path(text, group)
+    cached = _split_cache_get(cache_path)
+    if cached is not None:
+        action_log("chunk_llm", model=config.CHUNK_MODEL, input_len=len(text), num_chunks=len(cached), fallback=False, cached=True, group=group)
+        return cached
+
     prompt = (
         'Split the following text into 2 or 3 coherent semantic segments. '
         'Each segment should be self-contained. '
@@ -308,57 +457,41 @@ def _llm_split_long(text: str, ollama_url: str, group: str = "_root") -> list[st
         'Text to split:\n'
     ) + text
 
+    global _split_schema_ok
+    payload = {
+        "model": config.CHUNK_MODEL,
+        "prompt": prompt,
+        "format": _SPLIT_SCHEMA if _split_schema_ok else "json",
+        "keep_alive": config.OLLAMA_KEEP_ALIVE,
+        # The reply restates the input as segments; cap it near that size so a runaway generation stops
+        "options": {"num_predict": 2 * _tokens_approx(text) + 256},
+    }
     try:
-        import requests
-
-        r = requests.post(
-            f"{ollama_url.rstrip('/')}/api/generate",
-            json={
-                "model": config.CHUNK_MODEL,
-                "prompt": prompt,
-                "stream": False,
-                "format": "json",
-            },
-            timeout=config.CHUNK_LLM_TIMEOUT,
-        )
-        r.raise_for_status()
-        data = r.json()
-        resp = (data.get("response") or "").strip()
-        
-        # Check for empty response before parsing
-        if not resp:
-            logger.warning("LLM returned empty response (input_len=%d chars, ~%d tokens), using mid-split", 
-                          len(text), _tokens_approx(text))
-            # Fall through to fallback
-        else:
-            # Handle markdown code block
-            if "```" in resp:
-                m = re.search(r"```(?:json)?\s*([\s\S]*?)```", resp)
-                if m:
-                    resp = m.group(1).strip()
-            
-            try:
-                obj: dict[str, Any] = json.loads(resp)
-                chunks = obj.get("chunks")
-                
-                # Validate chunks structure
-                if isinstance(chunks, list) and chunks:
-                    # Check all items are strings
-                    if all(isinstance(c, str) for c in chunks):
-                        out = [c.strip() for c in chunks if c.strip()]
-                        if out:  # Ensure we have at least one non-empty chunk
-                            action_log("chunk_llm", model=config.CHUNK_MODEL, input_len=len(text), num_chunks=len(out), fallback=False, group=group)
-                            return out
-                    else:
-                        logger.warning("LLM returned chunks with non-string items (input_len=%d chars, ~%d tokens), using mid-split", 
-                                      len(text), _tokens_approx(text))
-                else:
-                    logger.warning("LLM returned invalid chunks format (expected list, got %s) (input_len=%d chars, ~%d tokens), using mid-split", 
-                                  type(chunks).__name__, len(text), _tokens_approx(text))
-            except json.JSONDecodeError as e:
-                logger.warning("LLM returned invalid JSON (input_len=%d chars, ~%d tokens): %s, using mid-split", 
-                              len(text), _tokens_approx(text), e)
-                # Fall through to fallback
+        try:
+            resp = ollama.generate_text(ollama_url, payload, config.CHUNK_LLM_TIMEOUT, stop_after_json=True)
+        except requests.exceptions.HTTPError as e:
+            if payload["format"] == "json" or e.response is None or e.response.status_code != 400:
+                raise
+            # Pre-0.5 Ollama: retry unconstrained JSON mode (the prompt spells out the shape)
+            payload["format"] = "json"
+            resp = ollama.generate_text(ollama_url, payload, config.CHUNK_LLM_TIMEOUT, stop_after_json=True)
+            if _split_schema_ok:
+                _split_schema_ok = False
+                logger.info("Ollama rejected a JSON schema format (older than 0.5?); long-block splits use format=json")
+        resp = resp.strip()
+        # The schema fixes the shape; a reply can still be empty or cut off by num_predict, or unconstrained
+        # when sent with format=json
+        obj = loads(resp) if resp else None
+        out = [c.strip() for c in obj["chunks"] if c.strip()] if isinstance(obj, dict) else []
+        if out:
+            _split_cache_put(cache_path, out)
+            action_log("chunk_llm", model=config.CHUNK_MODEL, input_len=len(text), num_chunks=len(out), fallback=False, group=group)
+            return out
+        logger.warning("LLM returned no segments (input_len=%d chars, ~%d tokens), using mid-split",
+                      len(text), _tokens_approx(text))
+    except (json.JSONDecodeError, KeyError, TypeError, AttributeError) as e:
+        logger.warning("LLM returned invalid JSON (input_len=%d chars, ~%d tokens): %s, using mid-split",
+                      len(text), _tokens_approx(text), e)
     except requests.exceptions.Timeout as e:
         logger.warning("LLM split timed out after %d seconds (input_len=%d chars, ~%d tokens), using mid-split", 
                       config.CHUNK_LLM_TIMEOUT, len(text), _tokens_approx(text))
@@ -373,9 +506,13 @@ def _llm_split_long(text: str, ollama_url: str, group: str = "_root") -> list[st
 
     # Fallback: split near the middle at a sentence or newline
     mid = len(text) // 2
+    # Search one slice around the middle (clamped: a negative start would index from the end)
+    lo = max(0, mid - 200)
+    window = text[lo : mid + 200]
     for sep in (". ", ".\n", "\n", " "):
-        i = text.find(sep, mid - 200, mid + 200)
-        if i != -1:
+        j = window.find(sep)
+        if j != -1:
+            i = lo + j
             out = [text[: i + len(sep)].strip(), text[i + len(sep) :].strip()]
             action_log("chunk_llm", model=config.CHUNK_MODEL, input_len=len(text), num_chunks=len(out), fallback=True, group=group)
             return out
@@ -384,40 +521,90 @@ def _llm_split_long(text: str, ollama_url: str, group: str = "_root") -> list[st
     return out
 
 
+def _try_sentence_pack(text: str) -> list[str] | None:
+    """
+    Greedily pack whole sentences of text into chunks of up to TARGET_CHUNK_TOKENS (original spacing kept).
+    None if some sentence alone exceeds MAX_CHUNK_TOKENS, i.e. the text needs a semantic (LLM) split.
+    """
+    out: list[str] = []
+    chunk_start = sent_start = 0
+    chunk_end = -1  # end of the last sentence in the current chunk; -1 = chunk is empty
+    chunk_tokens = 0
+    ends = [(m.start(), m.end()) for m in _SENTENCE_END_RE.finditer(text)]
+    ends.append((len(text), len(text)))
+    for sent_end, next_start in ends:
+        # Same estimate as _tokens_approx, from the offsets (no slice of the sentence)
+        tokens = (sent_end - sent_start) // CHARS_PER_TOKEN or 1
+        if tokens > config.MAX_CHUNK_TOKENS:
+            return None
+        if chunk_end >= 0 and chunk_tokens + tokens > config.TARGET_CHUNK_TOKENS:
+            out.append(text[chunk_start:chunk_end])
+            chunk_start, chunk_tokens = sent_start, 0
+        chunk_end = sent_end
+        chunk_tokens += tokens
+        sent_start = next_start
+    out.append(text[chunk_start:chunk_end])
+    return out
+
+
+def _split_long_block(block: str, ollama_url: str, group: str = "_root") -> list[str]:
+    """
+    Split one oversized block: by sentence packing when every sentence fits (RAGDOLL_SENTENCE_PACK),
+    otherwise by LLM, where any part still over MAX_CHUNK_TOKENS is split once more.
+    """
+    if config.SENTENCE_PACK:
+        packed = _try_sentence_pack(block)
+        if packed is not None:
+            return packed
+    out: list[str] = []
+    for s in _llm_split_long(block, ollama_url, group):
+        if _tokens_approx(s) <= config.MAX_CHUNK_TOKENS:
+            out.append(s)
+        else:
+            # recurse would be safe but could be slow; mid-split again
+            out.extend(_llm_split_long(s, ollama_url, group))
+    return out
+
+
 def chunk_text(text: str, ollama_url: str | None = None, group: str = "_root") -> list[str]:
     """
     Split text into semantic chunks. Uses paragraph boundaries and, for very long
     paragraphs, llama3.2 to find semantic split points.
     """
     url = ollama_url or config.OLLAMA_HOST
-    blocks = _split_blocks(text)
+    blocks = list(_iter_blocks(text))
     if not blocks:
         return []
 
-    chunks: list[str] = []
+    # Oversized blocks each need an LLM split (the slow part): run those requests concurrently
+    # up front, once per distinct block text, then stitch the results back in block order below
+    longs = [i for i, (_block, tokens) in enumerate(blocks) if tokens > config.MAX_CHUNK_TOKENS]
+    unique = list(dict.fromkeys(blocks[i][0] for i in longs))
+    parts: dict[str, list[str]] = {}
+    if len(unique) == 1:
+        parts = {unique[0]: _split_long_block(unique[0], url, group)}
+    elif unique:
+        with ThreadPoolExecutor(max_workers=min(config.OLLAMA_NUM_PARALLEL, len(unique))) as pool:
+            parts = dict(zip(unique, pool.map(lambda b: _split_long_block(b, url, group), unique)))
+    split: dict[int, list[str]] = {i: parts[blocks[i][0]] for i in longs}
+
+    # Each chunk is kept as its list of blocks and joined once on return
+    chunks: list[list[str]] = []
     current: list[str] = []
     current_tokens = 0
 
-    for i, block in enumerate(blocks):
-        block_tokens = _tokens_approx(block)
-
-        if block_tokens > config.MAX_CHUNK_TOKENS:
+    for i, (block, block_tokens) in enumerate(blocks):
+        if i in split:
             # Flush current before handling long block
             if current:
-                chunks.append("\n\n".join(current))
+                chunks.append(current)
                 current = []
                 current_tokens = 0
-            sub = _llm_split_long(block, url, group)
-            for s in sub:
-                if _tokens_approx(s) <= config.MAX_CHUNK_TOKENS:
-                    chunks.append(s)
-                else:
-                    # recurse would be safe but could be slow; mid-split again
-                    chunks.extend(_llm_split_long(s, url, group))
+            chunks.extend([s] for s in split[i] if s)
             continue
 
         if current_tokens + block_tokens > config.TARGET_CHUNK_TOKENS and current:
-            chunks.append("\n\n".join(current))
+            chunks.append(current)
             # Optional: overlap by keeping last N sentences of previous chunk
             current = []
             current_tokens = 0
@@ -426,6 +613,7 @@ def chunk_text(text: str, ollama_url: str | None = None, group: str = "_root") -
         current_tokens += block_tokens
 
     if current:
-        chunks.append("\n\n".join(current))
+        chunks.append(current)
 
-    return [c for c in chunks if c.strip()]
+    # Blocks are non-empty and already stripped (empty split parts, e.g. from a mid-split, are skipped above)
+    return ["\n\n".join(c) for c in chunks]
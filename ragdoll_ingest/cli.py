@@ -1,13 +1,13 @@
 """CLI tool for managing RAGDoll collections and sources."""
 
 import argparse
+import os
 import shutil
 import sys
 from pathlib import Path
 
 from . import config
 from .chunk_csv import CHUNK_CSV_HEADERS
-from .csv_import import parse_csv_bytes, run_csv_import
 from .storage import (
     _connect,
     _list_sync_groups,
@@ -21,6 +21,9 @@ from .storage import (
 
 def cmd_import_csv(args: argparse.Namespace) -> int:
     """Import chunks from CSV (same columns as Review export)."""
+    # Imported here: csv_import pulls in the embedder and HTTP stack, which the other commands never use
+    from .csv_import import parse_csv_bytes, run_csv_import
+
     csv_path = Path(args.csv_path).expanduser().resolve()
     if not csv_path.is_file():
         print(f"Error: file not found: {csv_path}", file=sys.stderr)
@@ -54,6 +57,19 @@ def cmd_import_csv(args: argparse.Namespace) -> int:
     return 0
 
 
+def _require_collection(group: str) -> bool:
+    """
+    True if group is an existing collection (a DATA_DIR subdirectory with ragdoll.db). Checks that one
+    path; all collections are listed only to report a missing one.
+    """
+    if group not in ("", ".", "..") and "/" not in group and os.sep not in group:
+        if (Path(config.DATA_DIR) / group / "ragdoll.db").exists():
+            return True
+    print(f"Error: Collection '{group}' not found.", file=sys.stderr)
+    print(f"Available collections: {', '.join(sorted(_list_sync_groups()))}", file=sys.stderr)
+    return False
+
+
 def cmd_collections(args: argparse.Namespace) -> int:
     """List all collections."""
     collections = _list_sync_groups()
@@ -70,11 +86,7 @@ def cmd_collections(args: argparse.Namespace) -> int:
 def cmd_list(args: argparse.Namespace) -> int:
     """List all sources in a collection."""
     group = args.collection
-    collections = _list_sync_groups()
-    
-    if group not in collections:
-        print(f"Error: Collection '{group}' not found.", file=sys.stderr)
-        print(f"Available collections: {', '.join(sorted(collections))}", file=sys.stderr)
+    if not _require_collection(group):
         return 1
     
     conn = _connect(group)
@@ -89,9 +101,8 @@ def cmd_list(args: argparse.Namespace) -> int:
         print("-" * 80)
         total_chunks = 0
         for source_id, source_path, count, _summary, _eu, display_title in sources:
-            basename = Path(source_path).name
-            dt = (display_title or "").strip()
-            filename = dt or basename
+            # Basename only when there is no display title (os.path, no Path object per row)
+            filename = (display_title or "").strip() or os.path.basename(source_path)
             display_cell = filename if len(filename) <= 58 else filename[:55] + "..."
             print(f"{source_id:<6} {display_cell:<60} {count:<10}")
             total_chunks += count
@@ -112,11 +123,7 @@ def cmd_delete(args: argparse.Namespace) -> int:
         print(f"Use 'ragdoll list {group}' to see source IDs.", file=sys.stderr)
         return 1
     
-    collections = _list_sync_groups()
-    
-    if group not in collections:
-        print(f"Error: Collection '{group}' not found.", file=sys.stderr)
-        print(f"Available collections: {', '.join(sorted(collections))}", file=sys.stderr)
+    if not _require_collection(group):
         return 1
     
     conn = _connect(group)
@@ -129,10 +136,7 @@ def cmd_delete(args: argparse.Namespace) -> int:
             print(f"Use 'ragdoll list {group}' to see available source IDs.", file=sys.stderr)
             return 1
         
-        source_path, source_type = source_info
-        
-        # Get chunk count
-        count = conn.execute("SELECT COUNT(*) FROM chunks WHERE source_id = ?", (source_id,)).fetchone()[0]
+        source_path, source_type, count = source_info
         
         if count == 0:
             print(f"Source ID {source_id} ({source_path}) has no chunks.", file=sys.stderr)
@@ -194,10 +198,7 @@ def cmd_reprocess(args: argparse.Namespace) -> int:
     if not match:
         print("Error: path or filename is required.", file=sys.stderr)
         return 1
-    collections = _list_sync_groups()
-    if group not in collections:
-        print(f"Error: Collection '{group}' not found.", file=sys.stderr)
-        print(f"Available collections: {', '.join(sorted(collections))}", file=sys.stderr)
+    if not _require_collection(group):
         return 1
     removed = unmark_processed(match, group)
     if removed > 0:
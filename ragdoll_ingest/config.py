@@ -1,6 +1,8 @@
 """Configuration from environment variables and optional env.ragdoll file."""
 
 import os
+import re
+from functools import lru_cache
 from pathlib import Path
 
 
@@ -71,14 +73,24 @@ class GroupPaths:
         self.artifacts_dir = group_dir / ARTIFACTS_SUBDIR
 
 
+# Characters not allowed in a group dir name. \w is Unicode-aware and matches exactly str.isalnum() plus "_",
+# so this keeps the same characters as a per-character isalnum() check, in one C-level pass.
+_GROUP_UNSAFE_RE = re.compile(r"[^\w.-]")
+
+
+@lru_cache(maxsize=256)
 def _sanitize_group(g: str) -> str:
     if not g or g in (".", ".."):
         return "_root"
-    return "".join(c if (c.isalnum() or c in "_.-") else "_" for c in g) or "_root"
+    return _GROUP_UNSAFE_RE.sub("_", g)
 
 
+@lru_cache(maxsize=256)
 def get_group_paths(group: str) -> GroupPaths:
-    """Paths for one output group. group='_root' for top-level ingest files; else first subfolder name."""
+    """
+    Paths for one output group. group='_root' for top-level ingest files; else first subfolder name.
+    Memoized per group name (DATA_DIR is fixed at import); treat the returned object as read-only.
+    """
     s = _sanitize_group(group)
     d = DATA_DIR / s
     return GroupPaths(
@@ -101,8 +113,24 @@ CHUNK_MODEL = get_env("RAGDOLL_CHUNK_MODEL") or "llama3.2:3b"
 INTERPRET_MODEL = get_env("RAGDOLL_INTERPRET_MODEL") or CHUNK_MODEL
 # LLM for query expansion (standalone description of information need)
 QUERY_MODEL = get_env("RAGDOLL_QUERY_MODEL") or "llama3.2:3b"
+# Max concurrent Ollama requests from one process (match the server's OLLAMA_NUM_PARALLEL slots)
+OLLAMA_NUM_PARALLEL = max(1, int(get_env("RAGDOLL_OLLAMA_NUM_PARALLEL") or get_env("OLLAMA_NUM_PARALLEL") or "4"))
+# How long Ollama keeps a model loaded after an ingest LLM request (Ollama duration, e.g. 30m; -1 = forever)
+OLLAMA_KEEP_ALIVE = get_env("RAGDOLL_OLLAMA_KEEP_ALIVE") or "30m"
 # Default minimum cosine similarity for /query and MCP query_rag (0.0–1.0). Lower = more results.
 QUERY_THRESHOLD = float(get_env("RAGDOLL_QUERY_THRESHOLD") or "0.45")
+# Collections scored with int8-quantized embeddings (comma-separated names, or * for all). Needs the
+# 'vector' (NumPy + SimSIMD) or 'jit' (NumPy + Numba) extra; uses 4x less memory per query scan at a
+# small cost in score precision.
+QUERY_INT8_GROUPS = {g.strip() for g in (get_env("RAGDOLL_QUERY_INT8_GROUPS") or "").split(",") if g.strip()}
+# Approximate search: collections with at least this many chunks are searched through an in-memory HNSW
+# index (needs the 'ann' extra) instead of scoring every chunk. 0 = always exact. Only the ANN_TOP_K
+# nearest chunks per collection are then checked against the threshold.
+ANN_MIN_CHUNKS = int(get_env("RAGDOLL_ANN_MIN_CHUNKS") or "0")
+ANN_TOP_K = max(1, int(get_env("RAGDOLL_ANN_TOP_K") or "200"))
+# Score chunks inside SQLite with the sqlite-vec extension (needs the 'sqlitevec' extra) instead of the
+# in-memory matrix: only matching rows are read into Python, at the cost of a full table scan per query.
+QUERY_SQLITE_VEC = (get_env("RAGDOLL_QUERY_SQLITE_VEC") or "false").lower() in ("true", "1", "yes")
 
 # API server
 API_PORT = int(get_env("RAGDOLL_API_PORT") or "9042")
@@ -130,6 +158,8 @@ OVERLAP_SENTENCES = int(get_env("RAGDOLL_OVERLAP_SENTENCES") or "1")
 CHUNK_LLM_TIMEOUT = int(get_env("RAGDOLL_CHUNK_LLM_TIMEOUT") or "300")
 # Semantic chunking: when True, combine all text into one string, clean it, and ask LLM for character start/end indices per chunk
 SEMANTIC_CHUNKING = (get_env("RAGDOLL_SEMANTIC_CHUNKING") or "true").lower() in ("true", "1", "yes")
+# Paragraph-based chunking: pack over-long paragraphs by sentence when every sentence fits; LLM split only otherwise
+SENTENCE_PACK = (get_env("RAGDOLL_SENTENCE_PACK") or "true").lower() in ("true", "1", "yes")
 
 # Supported extensions (lowercase)
 TEXT_EXT = {".txt", ".md", ".markdown"}
@@ -140,5 +170,23 @@ IMAGE_EXT = {".png", ".jpg", ".jpeg", ".tiff", ".tif", ".bmp", ".gif"}
 
 SUPPORTED_EXT = TEXT_EXT | WORD_EXT | EXCEL_EXT | PDF_EXT | IMAGE_EXT
 
+# Content types for serving source files (API /fetch and the review app), by lowercase extension
+SOURCE_MEDIA_TYPES = {
+    ".pdf": "application/pdf",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".doc": "application/msword",
+    ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ".xls": "application/vnd.ms-excel",
+    ".txt": "text/plain",
+    ".md": "text/markdown",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".gif": "image/gif",
+    ".bmp": "image/bmp",
+    ".tiff": "image/tiff",
+    ".tif": "image/tiff",
+}
+
 # Docling: when True, use Docling for every supported file (PDF/DOCX/XLSX/PPTX/image); when False, use Docling only for types RAGDoll has no legacy extractor for (e.g. PPTX, images as structured)
 ALWAYS_USE_DOCLING = (get_env("RAGDOLL_ALWAYS_USE_DOCLING") or "false").lower() in ("true", "1", "yes")
@@ -10,7 +10,7 @@ from dataclasses import dataclass, field
 
 from . import config
 from .chunk_csv import CHUNK_CSV_HEADERS
-from .embedder import build_text_to_embed, embed
+from .embedder import build_text_to_embed, embed_many
 from .memory import MEMORY_GROUP
 from .storage import (
     _connect,
@@ -212,11 +212,7 @@ def run_csv_import(
                 for r in valid_rows
             ]
 
-            batch_size = 100
-            all_embs: list[list[float]] = []
-            for i in range(0, len(embed_inputs), batch_size):
-                batch = embed_inputs[i : i + batch_size]
-                all_embs.extend(embed(batch, group=group))
+            all_embs = embed_many(embed_inputs, group=group)
 
             bodies: list[dict] = []
             for r, emb in zip(valid_rows, all_embs, strict=True):
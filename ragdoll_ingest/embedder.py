@@ -1,11 +1,13 @@
 """Embed text via Ollama nomic-embed-text."""
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
 
-from . import config
+from . import config, ollama
 from .action_log import log as action_log
+from .fastjson import loads
 
 logger = logging.getLogger(__name__)
 
@@ -39,18 +41,73 @@ def embed(texts: list[str], base_url: str | None = None, group: str = "_root") -
         return []
 
     try:
-        r = requests.post(
+        r = ollama.session().post(
             f"{url}/api/embed",
             json={"model": model, "input": texts},
             timeout=300,
         )
         r.raise_for_status()
-        data = r.json()
+        data = loads(r.content)
         embs = data.get("embeddings", [])
         dim = len(embs[0]) if embs else None
         action_log("embed", model=model, num_inputs=len(texts), num_outputs=len(embs), dim=dim, group=group)
         return embs
-    except requests.RequestException as e:
+    except (requests.RequestException, ValueError) as e:  # ValueError: reply body is not JSON
         action_log("embed_error", model=model, num_inputs=len(texts), error=str(e), group=group)
         logger.error("Embed request failed: %s", e)
         raise
+
+
+# Texts per /api/embed request in embed_many; large batches let the server batch on the GPU
+EMBED_BATCH_SIZE = 128
+# Characters per /api/embed request in embed_many, so a batch of long texts stays a moderate request body
+EMBED_BATCH_MAX_CHARS = 65_536
+
+
+def _batches(texts: list[str], batch_size: int, max_chars: int) -> list[list[str]]:
+    """Consecutive runs of texts with at most batch_size texts and max_chars characters each (a longer text goes alone)."""
+    batches: list[list[str]] = []
+    current: list[str] = []
+    chars = 0
+    for t in texts:
+        if current and (len(current) >= batch_size or chars + len(t) > max_chars):
+            batches.append(current)
+            current, chars = [], 0
+        current.append(t)
+        chars += len(t)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def embed_many(
+    texts: list[str],
+    base_url: str | None = None,
+    group: str = "_root",
+    batch_size: int = EMBED_BATCH_SIZE,
+    max_chars: int = EMBED_BATCH_MAX_CHARS,
+) -> list[list[float]]:
+    """
+    Embed many texts (e.g. accumulated across sources). Identical texts are embedded
+    once; unique texts are split into requests of up to batch_size texts and max_chars
+    characters, and up to config.OLLAMA_NUM_PARALLEL of them are sent concurrently.
+    Returns embeddings in input order (duplicates share one vector); raises if any batch fails.
+    """
+    if not texts:
+        return []
+    slot: dict[str, int] = {}
+    order = [slot.setdefault(t, len(slot)) for t in texts]
+    unique = list(slot)
+    batches = _batches(unique, batch_size, max_chars)
+    if len(batches) == 1:
+        embs = embed(batches[0], base_url=base_url, group=group)
+    else:
+        workers = min(config.OLLAMA_NUM_PARALLEL, len(batches))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(lambda b: embed(b, base_url=base_url, group=group), batches))
+        embs = [e for batch_embs in results for e in batch_embs]
+    if len(embs) != len(unique):
+        raise RuntimeError(f"embed returned {len(embs)} vectors for {len(unique)} texts")
+    if len(unique) == len(texts):
+        return embs
+    return [embs[i] for i in order]
@@ -1,6 +1,9 @@
 """Extract plain text or structured document (text/chart/table blocks) from supported file types."""
 
 import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
 
@@ -262,9 +265,10 @@ def _extract_excel_document(path: Path) -> Document:
 
         wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
         for sh in wb.worksheets:
+            # values_only: plain values per row, no cell object per cell
             data = [
-                [str(c.value).strip() if c.value is not None else "" for c in row]
-                for row in sh.iter_rows(max_row=500)
+                [str(v).strip() if v is not None else "" for v in row]
+                for row in sh.iter_rows(max_row=500, values_only=True)
             ]
             data = [r for r in data if any(r)]  # drop empty rows
             if data:
@@ -277,7 +281,8 @@ def _extract_excel_document(path: Path) -> Document:
         wb = xlrd.open_workbook(path)
         for i in range(wb.nsheets):
             sh = wb.sheet_by_index(i)
-            data = [[str(sh.cell_value(r, c)) for c in range(sh.ncols)] for r in range(min(sh.nrows, 500))]
+            # row_values: one call per row instead of one cell_value call per cell
+            data = [[str(v) for v in sh.row_values(r)] for r in range(min(sh.nrows, 500))]
             data = [r for r in data if any(r)]
             if data:
                 out.table_regions.append(TableRegion(page=None, data=data))
@@ -294,25 +299,32 @@ def ocr_image_bytes(image_bytes: bytes) -> str:
     return pytesseract.image_to_string(img) or ""
 
 
+# Concurrent OCR calls in ocr_images_bytes. Each call runs its own tesseract process, which may itself use
+# a few threads, so this stays well under the core count.
+OCR_WORKERS = max(1, min(8, (os.cpu_count() or 1) // 2))
+
+
+def ocr_images_bytes(images: list[bytes]) -> list[str]:
+    """
+    ocr_image_bytes for several images, results in input order. pytesseract runs tesseract as a
+    subprocess, so a thread pool overlaps the OCR of up to OCR_WORKERS images.
+    """
+    if len(images) <= 1 or OCR_WORKERS == 1:
+        return [ocr_image_bytes(b) for b in images]
+    with ThreadPoolExecutor(max_workers=min(OCR_WORKERS, len(images))) as pool:
+        return list(pool.map(ocr_image_bytes, images))
+
+
 # --- Plain text extraction (fallback and for .txt, .md, .image) ---
 
 def extract_text(path: Path) -> str:
     """Extract text from a file. Raises ValueError if unsupported or on error."""
     path = Path(path)
     suffix = path.suffix.lower()
-
-    if suffix in config.TEXT_EXT:
-        return _extract_plain(path)
-    if suffix in config.WORD_EXT:
-        return _extract_docx(path)
-    if suffix in config.EXCEL_EXT:
-        return _extract_excel(path)
-    if suffix in config.PDF_EXT:
-        return _extract_pdf(path)
-    if suffix in config.IMAGE_EXT:
-        return _extract_image(path)
-
-    raise ValueError(f"Unsupported extension: {suffix}")
+    extract = _TEXT_EXTRACTORS.get(suffix)
+    if extract is None:
+        raise ValueError(f"Unsupported extension: {suffix}")
+    return extract(path)
 
 
 def _extract_plain(path: Path) -> str:
@@ -350,8 +362,7 @@ def _extract_excel(path: Path) -> str:
         for i in range(wb.nsheets):
             sh = wb.sheet_by_index(i)
             for r in range(sh.nrows):
-                row = [sh.cell_value(r, c) for c in range(sh.ncols)]
-                line = "\t".join(str(c) if c else "" for c in row).strip()
+                line = "\t".join(str(c) if c else "" for c in sh.row_values(r)).strip()
                 if line:
                     parts.append(line)
 
@@ -360,14 +371,42 @@ def _extract_excel(path: Path) -> str:
     return "\n".join(parts)
 
 
+# PDFs with at least this many pages have their text extracted by several processes, each over a page range.
+# PyMuPDF is not thread-safe and holds the GIL, so processes (each opening its own handle) are the only way
+# to use more than one core; spawned workers cost a fresh import, which only pays off on long documents.
+PDF_PARALLEL_MIN_PAGES = 64
+PDF_PAGES_PER_WORKER = 32
+
+
+def _pdf_pages_text(path: str, start: int, stop: int) -> list[str]:
+    """Text of pages [start, stop) of the PDF at path. Top-level so worker processes can run it."""
+    import fitz  # PyMuPDF
+
+    doc = fitz.open(path)
+    try:
+        return [doc[i].get_text() for i in range(start, stop)]
+    finally:
+        doc.close()
+
+
 def _extract_pdf(path: Path) -> str:
     import fitz  # PyMuPDF
 
     doc = fitz.open(path)
     try:
-        return "\n".join(page.get_text() for page in doc)
+        n = doc.page_count
+        if n < PDF_PARALLEL_MIN_PAGES:
+            return "\n".join(page.get_text() for page in doc)
     finally:
         doc.close()
+    workers = min(os.cpu_count() or 1, -(-n // PDF_PAGES_PER_WORKER))
+    if workers < 2:
+        return "\n".join(_pdf_pages_text(str(path), 0, n))
+    bounds = [(n * i // workers, n * (i + 1) // workers) for i in range(workers)]
+    # spawn, not fork: the watcher process has threads, and forking those can deadlock the child
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        parts = pool.map(_pdf_pages_text, [str(path)] * workers, *zip(*bounds))
+        return "\n".join(text for part in parts for text in part)
 
 
 def _extract_image(path: Path) -> str:
@@ -376,3 +415,14 @@ def _extract_image(path: Path) -> str:
 
     img = Image.open(path)
     return pytesseract.image_to_string(img)
+
+
+# extract_text dispatch: suffix -> extractor, built once (the extension sets are fixed at import).
+# Later entries win on a shared suffix, matching the order the checks used to run in.
+_TEXT_EXTRACTORS = {
+    **dict.fromkeys(config.IMAGE_EXT, _extract_image),
+    **dict.fromkeys(config.PDF_EXT, _extract_pdf),
+    **dict.fromkeys(config.EXCEL_EXT, _extract_excel),
+    **dict.fromkeys(config.WORD_EXT, _extract_docx),
+    **dict.fromkeys(config.TEXT_EXT, _extract_plain),
+}
@@ -0,0 +1,23 @@
+"""JSON helpers that use orjson when installed (pip install -e '.[fast]') and stdlib json otherwise."""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """Compact UTF-8 JSON (non-ASCII kept as-is). Values that are not JSON types are written as str(value)."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def loads(data: str | bytes) -> Any:
+    """Parse JSON text or UTF-8 bytes. Raises json.JSONDecodeError (orjson's error subclasses it)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
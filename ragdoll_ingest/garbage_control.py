@@ -7,13 +7,15 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
-import requests
-
-from . import config
+from . import config, ollama
 from .action_log import log as action_log
+from .fastjson import loads
 
 logger = logging.getLogger(__name__)
 
+_WORD_RE = re.compile(r"\b[a-zA-Z]+\b")
+_SENTENCE_SPLIT_RE = re.compile(r"[.!?]+")
+
 # Common stopwords
 _STOPWORDS = {
     "the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for", "of", "with", "by", "from",
@@ -34,7 +36,7 @@ def _count_tokens_approx(text: str) -> int:
 
 def _lexical_diversity(text: str) -> float:
     """Calculate lexical diversity: unique words / total words."""
-    words = [w.lower() for w in re.findall(r"\b[a-zA-Z]+\b", text)]
+    words = [w.lower() for w in _WORD_RE.findall(text)]
     if not words:
         return 0.0
     return len(set(words)) / len(words)
@@ -42,7 +44,7 @@ def _lexical_diversity(text: str) -> float:
 
 def _stopword_ratio(text: str) -> float:
     """Ratio of stopwords to total words."""
-    words = [w.lower() for w in re.findall(r"\b[a-zA-Z]+\b", text)]
+    words = [w.lower() for w in _WORD_RE.findall(text)]
     if not words:
         return 1.0
     stopword_count = sum(1 for w in words if w in _STOPWORDS)
@@ -130,7 +132,7 @@ def _log_garbage(chunk: dict[str, Any], reason: str, stage: str, group: str, sou
     garbage_log = gp.group_dir / "garbage.log"
     
     with open(garbage_log, "a", encoding="utf-8") as f:
-        f.write(json.dumps(log_entry, ensure_ascii=False) + "\n")
+        f.write(json.dumps(log_entry, ensure_ascii=False, separators=(",", ":")) + "\n")
     
     # Also log via action_log
     action_log("garbage_reject", stage=stage, reason=reason, artifact_type=chunk.get("artifact_type"), 
@@ -153,13 +155,13 @@ def _llm_validate(chunk: dict[str, Any], group: str) -> bool:
     )
     
     try:
-        r = requests.post(
+        r = ollama.session().post(
             f"{url}/api/generate",
-            json={"model": model, "prompt": prompt, "stream": False},
+            json={"model": model, "prompt": prompt, "stream": False, "keep_alive": config.OLLAMA_KEEP_ALIVE},
             timeout=30,
         )
         r.raise_for_status()
-        response = r.json().get("response", "").strip().upper()
+        response = loads(r.content).get("response", "").strip().upper()
         return "YES" in response
     except Exception as e:
         logger.warning("LLM validation failed: %s, defaulting to accept", e)
@@ -232,7 +234,7 @@ def stage2_deterministic_scoring(chunk: dict[str, Any]) -> float:
     score += diversity * 0.3
     
     # Sentence structure signal (max 0.2)
-    sentences = re.split(r"[.!?]+", text)
+    sentences = _SENTENCE_SPLIT_RE.split(text)
     if len(sentences) >= 2:
         avg_sentence_len = sum(len(s.split()) for s in sentences if s.strip()) / len([s for s in sentences if s.strip()])
         if 5 <= avg_sentence_len <= 30:
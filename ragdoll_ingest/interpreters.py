@@ -1,14 +1,18 @@
 """LLM interpreters for charts and tables. Produce qualitative summaries only; no numeric guessing. Anti-hallucination."""
 
+import asyncio
 import json
 import logging
 import re
 
-from . import config
+from . import config, ollama
 from .action_log import log as action_log
+from .fastjson import loads
 
 logger = logging.getLogger(__name__)
 
+_CODEBLOCK_RE = re.compile(r"```(?:json)?\s*([\s\S]*?)```")
+
 CHUNK_ROLES = (
     "description",
     "application",
@@ -26,15 +30,13 @@ def _ollama_text(prompt: str, model: str, group: str = "_root", timeout: int | N
     timeout = timeout or config.CHUNK_LLM_TIMEOUT
     url = (config.OLLAMA_HOST or "").rstrip("/")
     try:
-        import requests
-
-        r = requests.post(
+        r = ollama.session().post(
             f"{url}/api/generate",
-            json={"model": model, "prompt": prompt, "stream": False},
+            json={"model": model, "prompt": prompt, "stream": False, "keep_alive": config.OLLAMA_KEEP_ALIVE},
             timeout=timeout,
         )
         r.raise_for_status()
-        out = (r.json().get("response") or "").strip() or None
+        out = (loads(r.content).get("response") or "").strip() or None
         if out is None:
             logger.info("Ollama returned empty or whitespace-only response (model=%s)", model)
         return out
@@ -91,6 +93,23 @@ def summarize_document(
     return summary
 
 
+async def summarize_document_async(
+    document_text: str,
+    group: str = "_root",
+    filename: str | None = None,
+    semaphore: asyncio.Semaphore | None = None,
+) -> str:
+    """
+    Async variant of summarize_document for running many summaries concurrently.
+    The blocking Ollama call runs in a worker thread; pass a shared semaphore
+    (e.g. sized to config.OLLAMA_NUM_PARALLEL) to cap in-flight requests.
+    """
+    if semaphore is None:
+        return await asyncio.to_thread(summarize_document, document_text, group, filename)
+    async with semaphore:
+        return await asyncio.to_thread(summarize_document, document_text, group, filename)
+
+
 # Max chars of chunk text to send for semantic labels (avoid huge prompts)
 CHUNK_SEMANTIC_MAX_CHARS = 8000
 
@@ -133,11 +152,11 @@ def extract_chunk_semantic_labels(chunk_text: str, group: str = "_root") -> dict
         return out
     resp = resp.strip()
     if "```" in resp:
-        m = re.search(r"```(?:json)?\s*([\s\S]*?)```", resp)
+        m = _CODEBLOCK_RE.search(resp)
         if m:
             resp = m.group(1).strip()
     try:
-        obj = json.loads(resp)
+        obj = loads(resp)
     except json.JSONDecodeError:
         return out
     if not isinstance(obj, dict):
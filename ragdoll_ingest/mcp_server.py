@@ -65,8 +65,7 @@ def _make_mcp() -> "FastMCP":
         """
         try:
             use_threshold = config.QUERY_THRESHOLD if threshold is None else threshold
-            result = await asyncio.to_thread(
-                _do_query,
+            result = await _do_query(
                 prompt,
                 history,
                 use_threshold,
@@ -134,18 +133,10 @@ def _make_mcp() -> "FastMCP":
         try:
             init_db(conn)
             raw = list_sources(conn)
-            gp = config.get_group_paths(safe_group)
-            sources_dir = gp.sources_dir.resolve()
             out = []
             for source_id, source_path, count, summary, external_url, display_title in raw:
-                try:
-                    p = Path(source_path)
-                    if p.is_absolute() and str(p).startswith(str(sources_dir)):
-                        name = p.name
-                    else:
-                        name = Path(source_path).name if source_path else f"Source {source_id}"
-                except Exception:
-                    name = source_path or f"Source {source_id}"
+                # The basename whether or not the file is under sources/ (one Path per row, no resolve())
+                name = Path(source_path).name if source_path else f"Source {source_id}"
                 disp = (display_title or "").strip() if display_title else ""
                 pretty = disp or name
                 out.append({
@@ -0,0 +1,96 @@
+"""Shared HTTP session for Ollama calls: one pooled keep-alive connection set per process."""
+
+import atexit
+import json
+import threading
+import time
+from typing import Any
+
+from . import config
+from .fastjson import dumps_bytes, loads
+
+# Idle connections kept per host; in-flight requests beyond this open extra connections that are not kept
+OLLAMA_POOL_MAXSIZE = max(16, config.OLLAMA_NUM_PARALLEL * 2)
+
+_session: Any = None
+_session_lock = threading.Lock()
+
+
+def session() -> Any:
+    """
+    Process-wide requests.Session for Ollama, created on first use. Reusing it keeps TCP connections
+    open between calls instead of a new handshake per request. Safe to share across threads.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                s = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=OLLAMA_POOL_MAXSIZE, max_retries=1)
+                s.mount("http://", adapter)
+                s.mount("https://", adapter)
+                _session = s
+    return _session
+
+
+def close() -> None:
+    """Close the shared session's pooled connections. Registered with atexit; a later session() call opens a new one."""
+    global _session
+    with _session_lock:
+        s, _session = _session, None
+    if s is not None:
+        s.close()
+
+
+atexit.register(close)
+
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+def generate_text(base_url: str, payload: dict[str, Any], timeout: float, stop_after_json: bool = False) -> str:
+    """
+    POST /api/generate with streaming and return the concatenated response text. timeout bounds the whole
+    generation, as it does for a non-streamed call. With stop_after_json=True, reading stops as soon as the
+    text so far parses as one complete JSON value; closing the stream then makes Ollama stop generating
+    (JSON-format replies from some models trail whitespace until num_predict runs out).
+    Raises requests.exceptions.RequestException (Timeout past the deadline) or ValueError on an Ollama error line.
+    """
+    import requests
+
+    deadline = time.monotonic() + timeout
+    parts: list[str] = []
+    # Body serialized by fastjson (orjson when installed) rather than requests' stdlib json=
+    with session().post(
+        f"{base_url.rstrip('/')}/api/generate",
+        data=dumps_bytes({**payload, "stream": True}),
+        headers={"Content-Type": "application/json"},
+        timeout=timeout,
+        stream=True,
+    ) as r:
+        r.raise_for_status()
+        for line in r.iter_lines():
+            if not line:
+                continue
+            msg = loads(line)
+            if msg.get("error"):
+                raise ValueError(f"Ollama error: {msg['error']}")
+            frag = msg.get("response") or ""
+            if frag:
+                parts.append(frag)
+                if stop_after_json and "}" in frag:
+                    text = "".join(parts).strip()
+                    try:
+                        _obj, end = _JSON_DECODER.raw_decode(text)
+                    except ValueError:
+                        pass
+                    else:
+                        return text[:end]
+            if msg.get("done"):
+                break
+            if time.monotonic() > deadline:
+                raise requests.exceptions.Timeout(f"generation exceeded {timeout}s")
+    return "".join(parts)
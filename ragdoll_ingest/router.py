@@ -8,6 +8,10 @@ from .extractors import ocr_image_bytes
 from .interpreters import interpret_chart, interpret_figure, interpret_table
 from .storage import get_key_phrases_for_content
 
+_FLOW_MARKERS_RE = re.compile(r"->|=>|→|←|↓|↑|yes|no|start|end|decision", re.I)
+_TAB_OR_GAP_RE = re.compile(r"\t|\s{2,}")
+_GAP_RE = re.compile(r"\s{2,}")
+
 
 def classify_image(ocr_text: str) -> str:
     """
@@ -17,13 +21,13 @@ def classify_image(ocr_text: str) -> str:
     lines = [ln.strip() for ln in t.splitlines() if ln.strip()]
 
     # Figure: arrows, decision words, many short lines
-    arrows = bool(re.search(r"->|=>|→|←|↓|↑|yes|no|start|end|decision", t, re.I))
+    arrows = bool(_FLOW_MARKERS_RE.search(t))
     if arrows and len(lines) >= 3 and sum(len(l) for l in lines) / max(1, len(lines)) < 60:
         return "figure"
 
     # Table: many lines with 3+ columns (tabs or 2+ spaces)
     if len(lines) >= 3:
-        cols = [len(re.split(r"\t|\s{2,}", ln)) for ln in lines]
+        cols = [len(_TAB_OR_GAP_RE.split(ln)) for ln in lines]
         if max(cols, default=0) >= 3 and sum(1 for c in cols if c >= 2) >= len(lines) // 2:
             return "table"
 
@@ -43,7 +47,7 @@ def parse_ocr_to_table(ocr_text: str) -> list[list[str]]:
     # Prefer tabs; else 2+ spaces
     if any("\t" in ln for ln in lines):
         return [[c.strip() for c in ln.split("\t")] for ln in lines]
-    return [[c.strip() for c in re.split(r"\s{2,}", ln)] for ln in lines]
+    return [[c.strip() for c in _GAP_RE.split(ln)] for ln in lines]
 
 
 def route_image(
@@ -53,12 +57,15 @@ def route_image(
     group: str,
     source_stem: str,
     idx: int,
+    ocr: str | None = None,
 ) -> list[dict]:
     """
     OCR, classify, and route to text/chart/table/figure. Returns list of chunk dicts
     (text, artifact_type, artifact_path, page) without embedding.
+    Pass ocr when the image has already been OCR'd (e.g. in a batch) to skip running it again.
     """
-    ocr = ocr_image_bytes(image_bytes)
+    if ocr is None:
+        ocr = ocr_image_bytes(image_bytes)
     kind = classify_image(ocr)
 
     if kind == "text":
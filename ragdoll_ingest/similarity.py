@@ -0,0 +1,194 @@
+"""
+Vector similarity for retrieval. Uses SimSIMD / NumPy when installed (pip install -e '.[vector]'),
+pure Python otherwise. Numba (pip install -e '.[jit]') provides the int8 kernel when SimSIMD is missing.
+usearch (pip install -e '.[ann]') provides an optional HNSW index for approximate top-K search.
+"""
+
+import math
+import operator
+from typing import Any, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import simsimd
+except ImportError:
+    simsimd = None
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+try:
+    from usearch.index import Index as _UsearchIndex
+except ImportError:
+    _UsearchIndex = None
+
+if numba is not None and np is not None:
+
+    @numba.njit(fastmath=True, cache=True)
+    def _i8_cosines(mat, q):
+        """Cosine of int8 query q against each int8 row of mat; dot and both norms in one pass."""
+        n, d = mat.shape
+        out = np.zeros(n, dtype=np.float32)
+        qq = 0
+        for j in range(d):
+            qq += np.int32(q[j]) * np.int32(q[j])
+        if qq == 0:
+            return out
+        for i in range(n):
+            dot = 0
+            aa = 0
+            for j in range(d):
+                x = np.int32(mat[i, j])
+                dot += x * np.int32(q[j])
+                aa += x * x
+            if aa:
+                out[i] = dot / np.sqrt(np.float64(aa) * qq)
+        return out
+
+else:
+    _i8_cosines = None
+
+
+def _dot_py(a: Sequence[float], b: Sequence[float]) -> float:
+    return sum(map(operator.mul, a, b))
+
+
+# Dot product in one C-level pass (math.sumprod, Python 3.12+), else map/sum
+_dot = getattr(math, "sumprod", None) or _dot_py
+
+
+def as_matrix(vectors: Sequence[Sequence[float]], int8: bool = False) -> Any:
+    """
+    Stack equal-length vectors once for repeated scoring: a float32 (N, dim) NumPy matrix when
+    NumPy is installed, otherwise the vectors as a list. int8=True quantizes the matrix (see
+    _quantize_i8) when SimSIMD or Numba is also installed, for a 4x smaller scan; ignored otherwise.
+    """
+    if np is None:
+        return list(vectors)
+    mat = np.empty((len(vectors), len(vectors[0]) if vectors else 0), dtype=np.float32)
+    for i, v in enumerate(vectors):
+        mat[i] = v
+    if int8 and (simsimd is not None or _i8_cosines is not None):
+        return _quantize_i8(mat)
+    return mat
+
+
+def _quantize_i8(mat: Any) -> Any:
+    """Symmetric per-row int8 quantization. Cosine is scale-invariant, so the row scales are not kept."""
+    peak = np.abs(mat).max(axis=-1, keepdims=True)
+    peak[peak == 0] = 1.0
+    return np.round(mat * (127.0 / peak)).astype(np.int8)
+
+
+def _unit_score_matrix(queries: Sequence[Sequence[float]], unit_vectors: Any) -> Any:
+    """
+    NumPy path of the unit_* functions: (Q, N) float32 scores of each query against each row,
+    computed as one matrix product (or one SimSIMD cdist call) for all queries together.
+    """
+    qs = np.asarray(queries, dtype=np.float32).reshape(len(queries), -1)
+    mat = unit_vectors if isinstance(unit_vectors, np.ndarray) else as_matrix(unit_vectors)
+    norms = np.linalg.norm(qs, axis=1, keepdims=True)
+    # Zero queries stay zero and score 0.0 against every row
+    qs = np.divide(qs, norms, out=np.zeros_like(qs), where=norms > 0)
+    if mat.dtype == np.int8:
+        # Quantized rows are not unit length, so score with an int8 cosine kernel that rescales them
+        q8 = _quantize_i8(qs)
+        if simsimd is not None:
+            sims = 1.0 - np.asarray(simsimd.cdist(q8, mat, metric="cosine"), dtype=np.float32)
+            sims[norms[:, 0] == 0] = 0.0
+        else:
+            sims = np.stack([_i8_cosines(mat, q) for q in q8])
+    elif simsimd is not None:
+        sims = np.asarray(simsimd.cdist(qs, mat, metric="dot"), dtype=np.float32)
+    else:
+        sims = qs @ mat.T
+    return np.clip(sims, -1.0, 1.0)
+
+
+def _unit_scores(query: Sequence[float], unit_vectors: Any) -> Any:
+    """NumPy path of unit_similarities: float32 score vector, one entry per row."""
+    return _unit_score_matrix([query], unit_vectors)[0]
+
+
+def unit_similarities(query: Sequence[float], unit_vectors: Any) -> list[float]:
+    """
+    Cosine similarity of query against vectors that are already L2-normalized (as stored chunk
+    embeddings are): the query is normalized once, then each score is a single dot product.
+    unit_vectors is a sequence of vectors or a matrix from as_matrix().
+    """
+    if len(unit_vectors) == 0:
+        return []
+    if np is None:
+        norm = math.sqrt(math.fsum(x * x for x in query))
+        if norm == 0:
+            return [0.0] * len(unit_vectors)
+        q = [x / norm for x in query]
+        return [_dot(q, v) for v in unit_vectors]
+    return _unit_scores(query, unit_vectors).tolist()
+
+
+def unit_matches(query: Sequence[float], unit_vectors: Any, threshold: float) -> list[tuple[int, float]]:
+    """
+    (row index, similarity) for every row of unit_vectors scoring >= threshold against query, in row
+    order. With NumPy the threshold is applied to the whole score vector at once.
+    """
+    if len(unit_vectors) == 0:
+        return []
+    if np is None:
+        return [(i, s) for i, s in enumerate(unit_similarities(query, unit_vectors)) if s >= threshold]
+    sims = _unit_scores(query, unit_vectors)
+    idx = np.flatnonzero(sims >= threshold)
+    return list(zip(idx.tolist(), sims[idx].tolist()))
+
+
+def unit_matches_batch(
+    queries: Sequence[Sequence[float]], unit_vectors: Any, threshold: float
+) -> list[list[tuple[int, float]]]:
+    """
+    unit_matches for several queries at once, one list per query. With NumPy all queries are
+    scored in a single (Q, dim) x (dim, N) product, so the matrix is scanned once rather than Q times.
+    """
+    if not queries:
+        return []
+    if len(unit_vectors) == 0:
+        return [[] for _ in queries]
+    if np is None:
+        return [unit_matches(q, unit_vectors, threshold) for q in queries]
+    sims = _unit_score_matrix(queries, unit_vectors)
+    out = []
+    for row in sims:
+        idx = np.flatnonzero(row >= threshold)
+        out.append(list(zip(idx.tolist(), row[idx].tolist())))
+    return out
+
+
+def build_ann_index(unit_vectors: Any) -> Any:
+    """
+    HNSW index (usearch, cosine metric) over a float32 matrix from as_matrix(); row i is key i.
+    Returns None when usearch/NumPy are not installed or the matrix is not float32.
+    """
+    if _UsearchIndex is None or np is None or not isinstance(unit_vectors, np.ndarray):
+        return None
+    if unit_vectors.dtype != np.float32 or len(unit_vectors) == 0:
+        return None
+    index = _UsearchIndex(ndim=unit_vectors.shape[1], metric="cos", dtype="f32")
+    index.add(np.arange(len(unit_vectors), dtype=np.uint64), unit_vectors)
+    return index
+
+
+def ann_matches(index: Any, query: Sequence[float], threshold: float, k: int) -> list[tuple[int, float]]:
+    """Like unit_matches, but only over the approximate top-k rows found by an index from build_ann_index()."""
+    q = np.asarray(query, dtype=np.float32)
+    if not q.any():
+        return []
+    found = index.search(q, min(k, len(index)))
+    sims = 1.0 - np.asarray(found.distances, dtype=np.float32)
+    keep = sims >= threshold
+    keys = np.asarray(found.keys)[keep].tolist()
+    return sorted(zip(keys, np.clip(sims[keep], -1.0, 1.0).tolist()))
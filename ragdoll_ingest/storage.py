@@ -2,18 +2,38 @@
 
 import json
 import logging
+import math
+import os
 import re
 import shutil
 import sqlite3
+import sys
 import threading
+from array import array
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator, Sequence
 
-from . import config
+from . import config, ollama
 from .action_log import log as action_log
+from .fastjson import dumps_bytes, loads
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import sqlite_vec
+except ImportError:
+    sqlite_vec = None
 
 logger = logging.getLogger(__name__)
 
+_SPACES_RE = re.compile(r" +")
+_FILENAME_SPLIT_RE = re.compile(r"[_\-\s\.]+")
+_WORD3_RE = re.compile(r"\b[a-zA-Z]{3,}\b")
+_CODEBLOCK_RE = re.compile(r"```(?:json)?\s*([\s\S]*?)```")
+
 
 def clean_text(text: str) -> str:
     """Strip newlines, normalize whitespace, and clean characters that interfere with meaning."""
@@ -22,7 +42,7 @@ def clean_text(text: str) -> str:
     # Replace newlines, carriage returns, tabs with spaces
     text = text.replace("\n", " ").replace("\r", " ").replace("\t", " ")
     # Normalize multiple spaces to single space
-    text = re.sub(r" +", " ", text)
+    text = _SPACES_RE.sub(" ", text)
     # Strip leading/trailing whitespace
     return text.strip()
 
@@ -35,7 +55,7 @@ def extract_key_phrases_from_filename(filename: str) -> list[str]:
     stem = Path(filename).stem
     # Split on common delimiters but preserve meaningful sequences
     # First, try to preserve camelCase and TitleCase
-    parts = re.split(r"[_\-\s\.]+", stem)
+    parts = _FILENAME_SPLIT_RE.split(stem)
     phrases = []
     
     # Extract 2-3 word phrases from filename parts
@@ -76,7 +96,7 @@ def extract_key_phrases_from_text(text: str, max_phrases: int = 10) -> list[str]
     }
     
     # Extract words (alphanumeric, at least 3 chars)
-    words = [w.lower() for w in re.findall(r"\b[a-zA-Z]{3,}\b", text.lower()) if w.lower() not in stop_words]
+    words = [w.lower() for w in _WORD3_RE.findall(text.lower()) if w.lower() not in stop_words]
     
     if len(words) < 2:
         return []
@@ -127,27 +147,26 @@ def extract_key_phrases_llm(
         "Text:\n\n"
     ) + input_text
     try:
-        import requests
-
-        r = requests.post(
+        r = ollama.session().post(
             f"{url}/api/generate",
             json={
                 "model": config.INTERPRET_MODEL,
                 "prompt": prompt,
                 "stream": False,
                 "format": "json",
+                "keep_alive": config.OLLAMA_KEEP_ALIVE,
             },
             timeout=config.CHUNK_LLM_TIMEOUT,
         )
         r.raise_for_status()
-        resp = (r.json().get("response") or "").strip()
+        resp = (loads(r.content).get("response") or "").strip()
         if not resp:
             return []
         if "```" in resp:
-            m = re.search(r"```(?:json)?\s*([\s\S]*?)```", resp)
+            m = _CODEBLOCK_RE.search(resp)
             if m:
                 resp = m.group(1).strip()
-        obj = json.loads(resp)
+        obj = loads(resp)
         raw = obj.get("key_terms")
         if not isinstance(raw, list):
             return []
@@ -212,12 +231,12 @@ def _ensure_processed_loaded(group: str) -> None:
         gp = config.get_group_paths(group)
         _processed_cache[group] = set()
         if gp.processed_path.exists():
-            with open(gp.processed_path, "r", encoding="utf-8") as f:
+            with open(gp.processed_path, "rb") as f:
                 for line in f:
                     line = line.strip()
                     if not line:
                         continue
-                    rec = json.loads(line)
+                    rec = loads(line)
                     _processed_cache[group].add((rec["path"], rec["mtime"], rec["size"]))
         logger.debug("Loaded %d processed records for group %s from %s", len(_processed_cache[group]), group, gp.processed_path)
 
@@ -232,8 +251,8 @@ def mark_processed(path: str, mtime: float, size: int, group: str) -> None:
     _ensure_processed_loaded(group)
     gp = config.get_group_paths(group)
     gp.group_dir.mkdir(parents=True, exist_ok=True)
-    line = json.dumps({"path": path, "mtime": mtime, "size": size}, ensure_ascii=False) + "\n"
-    with open(gp.processed_path, "a", encoding="utf-8") as f:
+    line = dumps_bytes({"path": path, "mtime": mtime, "size": size}) + b"\n"
+    with open(gp.processed_path, "ab") as f:
         f.write(line)
     with _processed_lock:
         _processed_cache[group].add((path, mtime, size))
@@ -267,7 +286,7 @@ def unmark_processed(match: str, group: str) -> int:
     removed = 0
     for line in lines:
         try:
-            rec = json.loads(line)
+            rec = loads(line)
             path = rec.get("path", "")
             if _processed_path_matches(path, match):
                 removed += 1
@@ -276,9 +295,11 @@ def unmark_processed(match: str, group: str) -> int:
             pass
         kept.append(line)
     if removed > 0:
-        with open(gp.processed_path, "w", encoding="utf-8") as f:
-            for line in kept:
-                f.write(line + "\n")
+        # One buffered write to a temp file, then an atomic swap: a reader never sees a half-written list
+        tmp = gp.processed_path.with_name(f"{gp.processed_path.name}.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("".join(line + "\n" for line in kept))
+        os.replace(tmp, gp.processed_path)
         with _processed_lock:
             if group in _processed_cache:
                 _processed_cache[group] = {
@@ -293,16 +314,168 @@ def unmark_processed(match: str, group: str) -> int:
 
 # SQLite busy timeout (seconds): wait for lock instead of failing with "database is locked"
 SQLITE_TIMEOUT = 15
+# Memory-map up to this many bytes of each DB file for reads
+SQLITE_MMAP_SIZE = 256 * 1024 * 1024
+# Page cache per connection in KiB (negative = KiB for PRAGMA cache_size)
+SQLITE_CACHE_KIB = 65536
+# Checkpoint the WAL after this many pages instead of the default 1000 (fewer stalls during bulk writes)
+SQLITE_WAL_AUTOCHECKPOINT = 10000
+
+# DB files already switched to WAL in this process (journal_mode is persistent, so once per file)
+_wal_paths: set[str] = set()
+
+
+# Embeddings are stored as packed little-endian float32 BLOBs (4 bytes per dimension), scaled to
+# unit length so retrieval can score cosine similarity as a plain dot product.
+# Rows written before this format hold a JSON array string; decode_embedding reads both.
+_SWAP_BYTES = sys.byteorder != "little"
+
+# PRAGMA user_version of a chunks DB. 1 = every stored embedding is an L2-normalized float32 BLOB.
+SCHEMA_VERSION = 1
+# Rows rewritten per executemany when migrating stored embeddings
+_MIGRATE_BATCH = 1000
+
+
+def _normalize_into(buf: array, start: int) -> None:
+    """Scale buf[start:] to unit length in place (zero vectors are left as-is)."""
+    norm = math.sqrt(math.fsum(x * x for x in buf[start:]))
+    if norm > 0 and abs(norm - 1.0) > 1e-6:
+        for i in range(start, len(buf)):
+            buf[i] /= norm
+
+
+def encode_embedding(vec: Sequence[float]) -> bytes:
+    """Pack one embedding vector as a unit-length float32 BLOB."""
+    a = array("f", vec)
+    _normalize_into(a, 0)
+    if _SWAP_BYTES:
+        a.byteswap()
+    return a.tobytes()
+
+
+def encode_embeddings(vecs: Sequence[Sequence[float]]) -> list[memoryview]:
+    """
+    Pack many embeddings (each scaled to unit length) into one contiguous float32 buffer and
+    return a per-row view of it for binding, instead of building a separate bytes object per row.
+    """
+    buf = array("f")
+    bounds = [0]
+    for v in vecs:
+        start = len(buf)
+        buf.extend(v)
+        _normalize_into(buf, start)
+        bounds.append(len(buf) * buf.itemsize)
+    if _SWAP_BYTES:
+        buf.byteswap()
+    mv = memoryview(buf).cast("B")
+    return [mv[a:b] for a, b in zip(bounds, bounds[1:])]
+
+
+def decode_embedding(value: bytes | str) -> Sequence[float]:
+    """
+    Stored embedding (float32 BLOB, or legacy JSON text) -> vector. Raises ValueError if malformed.
+    With NumPy installed a BLOB decodes to a read-only float32 view of the bytes (no copy).
+    """
+    if isinstance(value, str):
+        return json.loads(value)
+    if np is not None:
+        return np.frombuffer(value, dtype="<f4")
+    a = array("f")
+    a.frombytes(value)
+    if _SWAP_BYTES:
+        a.byteswap()
+    return a
 
 
 def _connect(group: str) -> sqlite3.Connection:
     gp = config.get_group_paths(group)
     gp.group_dir.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(gp.rag_db_path), timeout=SQLITE_TIMEOUT)
+    db_path = str(gp.rag_db_path)
+    conn = sqlite3.connect(db_path, timeout=SQLITE_TIMEOUT)
+    conn.row_factory = sqlite3.Row
+    # WAL lets readers (API, review app) run alongside the ingest writer; NORMAL sync is safe under WAL
+    try:
+        if db_path not in _wal_paths:
+            conn.execute("PRAGMA journal_mode=WAL")
+            _wal_paths.add(db_path)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        conn.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_KIB}")
+        conn.execute(f"PRAGMA wal_autocheckpoint={SQLITE_WAL_AUTOCHECKPOINT}")
+    except sqlite3.OperationalError as e:
+        logger.debug("Could not set pragmas on %s: %s", db_path, e)
+    return conn
+
+
+def _db_file_id(db_path: Path) -> tuple[int, int, int] | None:
+    """
+    (device, inode, ctime_ns) of a DB file, or None if it is missing. Changes when the file is
+    deleted and recreated (ctime guards against the new file reusing the old inode number).
+    """
+    try:
+        st = db_path.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_dev, st.st_ino, st.st_ctime_ns)
+
+
+# Per-thread read-only connections for query paths, keyed by DB path: path -> (connection, _db_file_id)
+_ro_local = threading.local()
+
+
+def connect_readonly(group: str) -> sqlite3.Connection:
+    """
+    Read-only connection to a group's DB (mode=ro, query_only), opened once per thread and reused
+    across calls until the DB file is replaced on disk. Callers must not close it. Does not create
+    or migrate the schema; run init_db on a _connect() connection first if the DB may be new or
+    from an older version.
+    """
+    conns: dict[str, tuple[sqlite3.Connection, tuple | None]] = _ro_local.__dict__.setdefault("conns", {})
+    db_path = config.get_group_paths(group).rag_db_path
+    key = str(db_path)
+    file_id = _db_file_id(db_path)
+    pooled = conns.get(key)
+    if pooled is not None:
+        if pooled[1] == file_id:
+            return pooled[0]
+        # Deleted and recreated (or rewritten): the old connection still reads the old inode.
+        # Forget its sqlite-vec state too, since a new connection may reuse its id().
+        _ro_local.__dict__.get("vec_loaded", set()).discard(id(pooled[0]))
+        pooled[0].close()
+        del conns[key]
+    conn = sqlite3.connect(f"{db_path.resolve().as_uri()}?mode=ro", uri=True, timeout=SQLITE_TIMEOUT)
     conn.row_factory = sqlite3.Row
+    try:
+        conn.execute("PRAGMA query_only=1")
+        conn.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        conn.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_KIB}")
+    except sqlite3.OperationalError as e:
+        logger.debug("Could not set pragmas on %s: %s", key, e)
+    conns[key] = (conn, file_id)
     return conn
 
 
+def load_sqlite_vec(conn: sqlite3.Connection) -> None:
+    """
+    Load the sqlite-vec extension (pip install -e '.[sqlitevec]') into conn, making its vector SQL
+    functions (e.g. vec_distance_cosine) available; they read the float32 embedding BLOBs directly.
+    Idempotent per connection. Raises RuntimeError if the package or extension loading is unavailable.
+    """
+    loaded: set[int] = _ro_local.__dict__.setdefault("vec_loaded", set())
+    if id(conn) in loaded:
+        return
+    if sqlite_vec is None:
+        raise RuntimeError("sqlite-vec is not installed")
+    try:
+        conn.enable_load_extension(True)
+        sqlite_vec.load(conn)
+        conn.enable_load_extension(False)
+    except (AttributeError, sqlite3.OperationalError) as e:
+        raise RuntimeError(f"Could not load sqlite-vec: {e}") from e
+    loaded.add(id(conn))
+
+
 def init_db(conn: sqlite3.Connection) -> None:
     # Create sources table first
     conn.executescript("""
@@ -358,7 +531,7 @@ def init_db(conn: sqlite3.Connection) -> None:
                 source_type TEXT NOT NULL,
                 chunk_index INTEGER NOT NULL,
                 text TEXT NOT NULL,
-                embedding TEXT NOT NULL,
+                embedding BLOB NOT NULL,
                 created_at TEXT DEFAULT (datetime('now')),
                 FOREIGN KEY (source_id) REFERENCES sources(id)
             );
@@ -388,6 +561,56 @@ def init_db(conn: sqlite3.Connection) -> None:
             if "duplicate" not in str(e).lower():
                 raise
 
+    _migrate_embeddings(conn)
+
+
+def _migrate_embeddings(conn: sqlite3.Connection) -> None:
+    """
+    Bring a chunks DB up to SCHEMA_VERSION: rewrite every stored embedding (legacy JSON text or
+    un-normalized BLOB) as a unit-length float32 BLOB, then record the version. Runs once per DB.
+    """
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+        return
+    # Join the caller's transaction if one is open; otherwise take the write lock up front
+    own_txn = not conn.in_transaction
+    if own_txn:
+        conn.execute("BEGIN IMMEDIATE")
+    n = 0
+    try:
+        # Re-check under the write lock: another process may have migrated meanwhile
+        if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            last_id = -1
+            while True:
+                batch = conn.execute(
+                    "SELECT id, embedding FROM chunks WHERE id > ? ORDER BY id LIMIT ?",
+                    (last_id, _MIGRATE_BATCH),
+                ).fetchall()
+                if not batch:
+                    break
+                last_id = batch[-1][0]
+                ids, vecs = [], []
+                for chunk_id, value in batch:
+                    try:
+                        vecs.append(decode_embedding(value))
+                    except ValueError as e:
+                        logger.warning("Leaving malformed embedding for chunk id %s as-is: %s", chunk_id, e)
+                        continue
+                    ids.append(chunk_id)
+                conn.executemany(
+                    "UPDATE chunks SET embedding = ? WHERE id = ?",
+                    list(zip(encode_embeddings(vecs), ids)),
+                )
+                n += len(ids)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        if own_txn:
+            conn.commit()
+    except Exception:
+        if own_txn:
+            conn.rollback()
+        raise
+    if n:
+        logger.info("Normalized %d stored embedding(s) to unit-length float32 (schema version %d)", n, SCHEMA_VERSION)
+
 
 def _migrate_sources_table(conn: sqlite3.Connection) -> None:
     """Migrate existing chunks to populate sources table and set source_id."""
@@ -502,9 +725,10 @@ def add_chunks(
     source_id = _get_or_create_source(conn, source_path, source_type)
     if doc_summary and (doc_summary := (doc_summary or "").strip()):
         set_source_summary(conn, source_id, doc_summary)
+    embs = encode_embeddings([c.get("embedding") or [] for c in chunks])
     for i, c in enumerate(chunks):
         text = clean_text(c.get("text", ""))
-        emb = c.get("embedding", [])
+        emb = embs[i]
         atype = c.get("artifact_type", "text")
         apath = c.get("artifact_path")
         page = c.get("page")
@@ -522,7 +746,7 @@ def add_chunks(
                artifact_type, artifact_path, page, concept, decision_context, primary_question_answered, key_signals, chunk_role)
                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
             (
-                source_id, source_path, source_type, i, text, json.dumps(emb),
+                source_id, source_path, source_type, i, text, emb,
                 atype, apath, page, concept, decision_context, primary_question_answered, key_signals, chunk_role,
             ),
         )
@@ -550,13 +774,20 @@ def delete_source_by_id(conn: sqlite3.Connection, source_id: int) -> int:
     return n_before - n_after
 
 
-def get_source_by_id(conn: sqlite3.Connection, source_id: int) -> tuple[str, str] | None:
-    """Get source_path and source_type for a given source_id. Returns (source_path, source_type) or None."""
+def get_source_by_id(conn: sqlite3.Connection, source_id: int) -> tuple[str, str, int] | None:
+    """
+    Get source_path, source_type and chunk count for a given source_id, in one query.
+    Returns (source_path, source_type, chunk_count) or None.
+    """
     init_db(conn)
     _migrate_sources_table(conn)  # Ensure migration is done
-    row = conn.execute("SELECT source_path, source_type FROM sources WHERE id = ?", (source_id,)).fetchone()
+    row = conn.execute(
+        "SELECT source_path, source_type, (SELECT COUNT(*) FROM chunks WHERE source_id = sources.id) AS n "
+        "FROM sources WHERE id = ?",
+        (source_id,),
+    ).fetchone()
     if row:
-        return (row["source_path"], row["source_type"])
+        return (row["source_path"], row["source_type"], row["n"])
     return None
 
 
@@ -579,6 +810,33 @@ def get_source_summary_by_path(conn: sqlite3.Connection, source_path: str) -> st
     return None
 
 
+# Bound parameters per IN (...) lookup (stays under SQLite's default 999-variable limit on old builds)
+_IN_BATCH = 500
+
+
+def get_source_summaries_by_paths(
+    conn: sqlite3.Connection, source_paths: Sequence[str], ensure_schema: bool = True
+) -> dict[str, str | None]:
+    """
+    Batch get_source_summary_by_path: one IN (...) query per 500 paths. Every path is a key in the result.
+    ensure_schema=False skips init_db and the sources migration (for read-only connections).
+    """
+    if ensure_schema:
+        init_db(conn)
+        _migrate_sources_table(conn)
+    paths = list(dict.fromkeys(source_paths))
+    out: dict[str, str | None] = dict.fromkeys(paths)
+    for i in range(0, len(paths), _IN_BATCH):
+        batch = paths[i : i + _IN_BATCH]
+        placeholders = ",".join("?" * len(batch))
+        for row in conn.execute(
+            f"SELECT source_path, summary FROM sources WHERE source_path IN ({placeholders})", batch
+        ):
+            if row["summary"] and str(row["summary"]).strip():
+                out[row["source_path"]] = str(row["summary"]).strip()
+    return out
+
+
 def set_source_summary(conn: sqlite3.Connection, source_id: int, summary: str | None) -> None:
     """Set the document summary for a source."""
     init_db(conn)
@@ -605,12 +863,13 @@ def list_sources(conn: sqlite3.Connection) -> list[tuple[int, str, int, str | No
     init_db(conn)
     _migrate_sources_table(conn)  # Ensure migration is done
 
+    # Per-source count as a correlated subquery: each is an ix_chunks_source_id lookup and sources is read
+    # in rowid order, so there is no GROUP BY over the (wide) source columns and no temp b-tree for ORDER BY
     rows = conn.execute(
         """
-        SELECT s.id, s.source_path, s.summary, s.external_url, s.display_title, COUNT(c.id) AS count
+        SELECT s.id, s.source_path, s.summary, s.external_url, s.display_title,
+               (SELECT COUNT(*) FROM chunks c WHERE c.source_id = s.id) AS count
         FROM sources s
-        LEFT JOIN chunks c ON c.source_id = s.id
-        GROUP BY s.id, s.source_path, s.summary, s.external_url, s.display_title
         ORDER BY s.id
         """
     ).fetchall()
@@ -701,6 +960,17 @@ def get_chunks_for_source(
     return out
 
 
+def iter_chunk_texts_for_source(conn: sqlite3.Connection, source_id: int) -> Iterator[tuple[int, str]]:
+    """
+    Yield (chunk_id, text) for a source in chunk order, straight from the cursor, so
+    callers that only need the text (e.g. backfills) never hold the whole source in memory.
+    Do not write on the same connection until the iterator is exhausted.
+    """
+    init_db(conn)
+    for row in conn.execute("SELECT id, text FROM chunks WHERE source_id = ? ORDER BY chunk_index", (source_id,)):
+        yield row[0], row[1] or ""
+
+
 def get_chunk_by_id(conn: sqlite3.Connection, chunk_id: int) -> dict | None:
     """Get a single chunk by id. Returns dict with id, source_id, source_path, source_type, chunk_index, text, page, artifact_type, concept, decision_context, primary_question_answered, key_signals, chunk_role, or None."""
     init_db(conn)
@@ -731,16 +1001,43 @@ def update_chunk_text(
     text = clean_text(new_text)
     conn.execute(
         "UPDATE chunks SET text = ?, embedding = ? WHERE id = ?",
-        (text, json.dumps(new_embedding), chunk_id),
+        (text, encode_embedding(new_embedding), chunk_id),
     )
 
 
+def update_chunk_texts(
+    conn: sqlite3.Connection, rows: list[tuple[int, str, list[float]]]
+) -> int:
+    """
+    Bulk update_chunk_text: rows are (chunk_id, new_text, new_embedding). Runs one
+    executemany inside a single BEGIN IMMEDIATE ... COMMIT. Returns number of rows.
+    """
+    if not rows:
+        return 0
+    init_db(conn)
+    blobs = encode_embeddings([emb for _, _, emb in rows])
+    params = [(clean_text(text), blob, chunk_id) for (chunk_id, text, _), blob in zip(rows, blobs)]
+    # One cursor and one prepared UPDATE for every row, inside an explicit write transaction
+    cur = conn.cursor()
+    try:
+        if not conn.in_transaction:
+            cur.execute("BEGIN IMMEDIATE")
+        cur.executemany("UPDATE chunks SET text = ?, embedding = ? WHERE id = ?", params)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+    conn.commit()
+    return len(params)
+
+
 def update_chunk_embedding(
     conn: sqlite3.Connection, chunk_id: int, embedding: list[float]
 ) -> None:
     """Update only the embedding for a chunk (e.g. after document summary or re-embed migration)."""
     init_db(conn)
-    conn.execute("UPDATE chunks SET embedding = ? WHERE id = ?", (json.dumps(embedding), chunk_id))
+    conn.execute("UPDATE chunks SET embedding = ? WHERE id = ?", (encode_embedding(embedding), chunk_id))
 
 
 def update_chunk_full(
@@ -764,7 +1061,7 @@ def update_chunk_full(
     key_signals_json = json.dumps([str(s).strip() for s in (key_signals or []) if str(s).strip()]) if key_signals else None
     conn.execute(
         """UPDATE chunks SET text = ?, embedding = ?, concept = ?, decision_context = ?, primary_question_answered = ?, key_signals = ?, chunk_role = ? WHERE id = ?""",
-        (text_clean, json.dumps(embedding), concept, decision_context, primary_question_answered, key_signals_json, chunk_role, chunk_id),
+        (text_clean, encode_embedding(embedding), concept, decision_context, primary_question_answered, key_signals_json, chunk_role, chunk_id),
     )
 
 
@@ -804,7 +1101,7 @@ def insert_chunk_at(
         """INSERT INTO chunks (source_id, source_path, source_type, chunk_index, text, embedding, artifact_type, artifact_path, page, concept, decision_context, primary_question_answered, key_signals, chunk_role)
            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
         (
-            source_id, source_path, source_type, at_index, text, json.dumps(embedding),
+            source_id, source_path, source_type, at_index, text, encode_embedding(embedding),
             artifact_type, artifact_path, page, concept, decision_context, primary_question_answered, key_signals_json, chunk_role,
         ),
     )
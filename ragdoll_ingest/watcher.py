@@ -5,6 +5,7 @@ import queue
 import shutil
 import threading
 import time
+from concurrent.futures import Future
 from pathlib import Path
 
 from watchdog.events import FileSystemEvent, FileSystemEventHandler
@@ -12,11 +13,11 @@ from watchdog.observers import Observer
 
 from . import config
 from .action_log import log as action_log
-from .artifacts import store_chart_image, store_figure, store_table
+from .artifacts import store_chart_image_async, store_figure_async, store_table
 from .chunker import _clean_for_chunking, chunk_text, chunk_text_semantic
-from .embedder import build_text_to_embed, embed
+from .embedder import build_text_to_embed, embed_many
 from .garbage_control import filter_chunks
-from .extractors import extract_document, extract_text, ocr_image_bytes
+from .extractors import extract_document, extract_text, ocr_images_bytes
 from .interpreters import (
     extract_chunk_semantic_labels,
     interpret_chart,
@@ -191,15 +192,24 @@ def _process_one(fpath: Path) -> None:
                 for blk in doc.text_blocks:
                     for c in chunk_text(blk.text, group=group):
                         chunks_list.append({"text": c, "artifact_type": "text", "artifact_path": None, "page": blk.page})
+            # OCR every chart, figure and embedded image up front, several at a time
+            n_charts, n_figures = len(doc.chart_regions), len(doc.figure_regions)
+            ocrs = ocr_images_bytes(
+                [cr.image_bytes for cr in doc.chart_regions]
+                + [fr.image_bytes for fr in doc.figure_regions]
+                + [ir.image_bytes for ir in doc.image_regions]
+            )
+            pending_writes: list[tuple[dict, Future]] = []
             for idx, cr in enumerate(doc.chart_regions):
-                ocr = ocr_image_bytes(cr.image_bytes)
+                ocr = ocrs[idx]
                 summary = interpret_chart(ocr, group=group, filename=str(p.stem) if p.stem else None)
-                ap = store_chart_image(group, p.stem, cr.page, idx, cr.image_bytes, cr.image_ext)
+                write = store_chart_image_async(group, p.stem, cr.page, idx, cr.image_bytes, cr.image_ext)
                 content = f"{summary}\n{ocr or ''}"
                 all_phrases = get_key_phrases_for_content(content, filename=str(p.stem) if p.stem else None, group=group)
                 if all_phrases:
                     summary = f"{summary} Key terms: {', '.join(all_phrases)}."
-                chunks_list.append({"text": summary, "artifact_type": "chart_summary", "artifact_path": ap, "page": cr.page})
+                chunks_list.append({"text": summary, "artifact_type": "chart_summary", "artifact_path": None, "page": cr.page})
+                pending_writes.append((chunks_list[-1], write))
             for idx, tr in enumerate(doc.table_regions):
                 summary = interpret_table(tr.data, group=group, filename=str(p.stem) if p.stem else None)
                 ap = store_table(group, p.stem, tr.page, idx, tr.data)
@@ -210,16 +220,21 @@ def _process_one(fpath: Path) -> None:
                     summary = f"{summary} Key terms: {', '.join(all_phrases)}."
                 chunks_list.append({"text": summary, "artifact_type": "table_summary", "artifact_path": ap, "page": tr.page})
             for idx, fr in enumerate(doc.figure_regions):
-                ocr = ocr_image_bytes(fr.image_bytes)
+                ocr = ocrs[n_charts + idx]
                 summary, process = interpret_figure(ocr, group=group, filename=str(p.stem) if p.stem else None)
-                ap = store_figure(group, p.stem, fr.page, idx, fr.image_bytes, process, ocr)
+                write = store_figure_async(group, p.stem, fr.page, idx, fr.image_bytes, process, ocr)
                 content = f"{summary}\n{ocr or ''}"
                 all_phrases = get_key_phrases_for_content(content, filename=str(p.stem) if p.stem else None, group=group)
                 if all_phrases:
                     summary = f"{summary} Key terms: {', '.join(all_phrases)}."
-                chunks_list.append({"text": summary, "artifact_type": "figure_summary", "artifact_path": ap, "page": fr.page})
+                chunks_list.append({"text": summary, "artifact_type": "figure_summary", "artifact_path": None, "page": fr.page})
+                pending_writes.append((chunks_list[-1], write))
+            # Image writes ran in the background; wait for them (a failed write fails extraction as before)
+            for chunk, write in pending_writes:
+                chunk["artifact_path"] = write.result()
             for idx, ir in enumerate(doc.image_regions):
-                chunks_list.extend(route_image(ir.image_bytes, ir.ext, ir.page_or_idx, group, p.stem, idx))
+                ocr = ocrs[n_charts + n_figures + idx]
+                chunks_list.extend(route_image(ir.image_bytes, ir.ext, ir.page_or_idx, group, p.stem, idx, ocr=ocr))
             action_log("extract_ok", file=str(p), text_blocks=len(doc.text_blocks), charts=len(doc.chart_regions), tables=len(doc.table_regions), figures=len(doc.figure_regions), images=len(doc.image_regions), group=group)
         else:
             # Fallback: .txt, .md, or extract_document returned nothing. Standalone images: classify and route.
@@ -321,7 +336,7 @@ def _process_one(fpath: Path) -> None:
 
     action_log("chunk_ok", file=str(p), num_chunks=len(chunks_list), group=group)
     try:
-        embs = embed([_text_to_embed(c) for c in chunks_list], group=group)
+        embs = embed_many([_text_to_embed(c) for c in chunks_list], group=group)
     except Exception as e:
         action_log("embed_fail", file=str(p), error=str(e), group=group)
         logger.exception("Embed failed for %s: %s", p, e)
@@ -11,7 +11,7 @@ from __future__ import annotations
 
 import sys
 
-from ragdoll_ingest.embedder import build_text_to_embed, embed
+from ragdoll_ingest.embedder import build_text_to_embed, embed_many
 from ragdoll_ingest.storage import (
     _connect,
     _list_sync_groups,
@@ -21,7 +21,7 @@ from ragdoll_ingest.storage import (
     update_chunk_embedding,
 )
 
-BATCH_SIZE = 100  # Max chunks per embed API call
+BATCH_SIZE = 128  # Max chunks per embed API call (requests are sent concurrently by embed_many)
 
 
 def rembed_group(group: str) -> tuple[int, int]:
@@ -31,32 +31,30 @@ def rembed_group(group: str) -> tuple[int, int]:
         init_db(conn)
         raw = list_sources(conn)
         sources_processed = 0
-        chunks_updated = 0
-        for source_id, _source_path, _count, summary, _ in raw:
+        # Collect chunks across all sources so embed_many can send full-size batches
+        all_chunks: list[dict] = []
+        to_embed_list: list[str] = []
+        for source_id, _source_path, _count, summary, *_ in raw:
             summary = (summary or "").strip() or ""
             chunks = get_chunks_for_source(conn, source_id)
             if not chunks:
                 continue
             sources_processed += 1
-            to_embed_list = [
+            all_chunks.extend(chunks)
+            to_embed_list.extend(
                 build_text_to_embed(
                     summary,
                     c.get("primary_question_answered"),
                     c.get("text") or "",
                 )
                 for c in chunks
-            ]
-            for i in range(0, len(to_embed_list), BATCH_SIZE):
-                batch_texts = to_embed_list[i : i + BATCH_SIZE]
-                batch_chunks = chunks[i : i + BATCH_SIZE]
-                embs = embed(batch_texts, group=group)
-                if len(embs) != len(batch_chunks):
-                    raise RuntimeError(
-                        f"Group {group} source_id {source_id}: embed returned {len(embs)}, expected {len(batch_chunks)}"
-                    )
-                for c, emb in zip(batch_chunks, embs):
-                    update_chunk_embedding(conn, c["id"], emb)
-                    chunks_updated += 1
+            )
+        embs = embed_many(to_embed_list, group=group, batch_size=BATCH_SIZE)
+        if len(embs) != len(all_chunks):
+            raise RuntimeError(f"Group {group}: embed returned {len(embs)}, expected {len(all_chunks)}")
+        for c, emb in zip(all_chunks, embs):
+            update_chunk_embedding(conn, c["id"], emb)
+        chunks_updated = len(all_chunks)
         conn.commit()
         return sources_processed, chunks_updated
     finally:
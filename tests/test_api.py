@@ -0,0 +1,95 @@
+"""Tests for ragdoll_ingest.api (POST /batch_query)."""
+
+import pytest
+
+pytest.importorskip("httpx")  # fastapi.testclient
+
+from fastapi.testclient import TestClient
+
+from ragdoll_ingest import api, config, storage
+
+# Query text -> embedding; chunk embeddings below are unit vectors along the axes
+_QUERY_EMBEDDINGS = {
+    "alpha": [1.0, 0.0, 0.0],
+    "beta": [0.0, 1.0, 0.0],
+    "alpha and beta": [0.6, 0.8, 0.0],
+    "nothing": [0.0, 0.0, 1.0],
+}
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "DATA_DIR", tmp_path)
+    config.get_group_paths.cache_clear()
+    api._sources_dir_resolved.cache_clear()
+    monkeypatch.setattr(api, "_EMB_CACHE", {})
+    monkeypatch.setattr(api, "_schema_ready", {})
+    monkeypatch.setattr(api, "_query_embedding_cache", api._TTLCache(api.QUERY_CACHE_MAX, api.QUERY_CACHE_TTL))
+    monkeypatch.setattr(api, "embed", lambda texts, group="_root": [_QUERY_EMBEDDINGS[t] for t in texts])
+    for group, chunks in {
+        "docs": [("/docs/a.txt", "About alpha.", [1.0, 0.0, 0.0]), ("/docs/b.txt", "About beta.", [0.0, 1.0, 0.0])],
+        "notes": [("/notes/c.txt", "Mostly alpha.", [0.8, 0.6, 0.0])],
+    }.items():
+        conn = storage._connect(group)
+        try:
+            for source_path, text, emb in chunks:
+                storage.add_chunks(conn, source_path, "text", [{"text": text, "embedding": emb}])
+            conn.commit()
+        finally:
+            conn.close()
+    yield TestClient(api.app)
+    config.get_group_paths.cache_clear()
+    api._sources_dir_resolved.cache_clear()
+
+
+def _texts(query: dict) -> list[str]:
+    return [r["text"] for r in query["results"]]
+
+
+def test_batch_query_one_result_list_per_prompt(client):
+    resp = client.post("/batch_query", json={"prompts": ["alpha", "beta", "nothing"], "threshold": 0.5})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["threshold"] == 0.5
+    assert [q["query"] for q in body["queries"]] == ["alpha", "beta", "nothing"]
+    alpha, beta, nothing = body["queries"]
+    # Sorted by similarity across both collections
+    assert _texts(alpha) == ["About alpha.", "Mostly alpha."]
+    assert [r["group"] for r in alpha["results"]] == ["docs", "notes"]
+    assert [r["similarity"] for r in alpha["results"]] == [1.0, 0.8]
+    assert _texts(beta) == ["About beta.", "Mostly alpha."]
+    assert nothing == {"query": "nothing", "documents": [], "results": [], "count": 0}
+    assert alpha["count"] == 2 and len(alpha["documents"]) == 2
+
+
+def test_batch_query_matches_single_query_retrieval(client):
+    prompts = list(_QUERY_EMBEDDINGS)
+    body = client.post("/batch_query", json={"prompts": prompts, "threshold": 0.3}).json()
+    groups = sorted(storage._list_sync_groups())
+    for prompt, query in zip(prompts, body["queries"]):
+        single = api._run_retrieval(groups, _QUERY_EMBEDDINGS[prompt], 0.3, None)
+        assert [(r["group"], r["text"], r["similarity"]) for r in query["results"]] == [
+            (r["group"], r["text"], r["similarity"]) for r in single
+        ]
+
+
+def test_batch_query_group_filter(client):
+    body = client.post("/batch_query", json={"prompts": ["alpha"], "threshold": 0.5, "group": ["notes"]}).json()
+    assert _texts(body["queries"][0]) == ["Mostly alpha."]
+    resp = client.post("/batch_query", json={"prompts": ["alpha"], "group": ["missing"]})
+    assert resp.status_code == 404
+
+
+def test_batch_query_empty_prompts(client):
+    assert client.post("/batch_query", json={"prompts": []}).json() == {"threshold": config.QUERY_THRESHOLD, "queries": []}
+
+
+def test_batch_query_sqlite_vec_mode_matches(client, monkeypatch):
+    expected = client.post("/batch_query", json={"prompts": ["alpha", "beta"], "threshold": 0.5}).json()
+    # With sqlite-vec unavailable this exercises the fallback; with it, scoring inside SQLite
+    monkeypatch.setattr(config, "QUERY_SQLITE_VEC", True)
+    monkeypatch.setattr(api, "_sqlite_vec_disabled", False)
+    got = client.post("/batch_query", json={"prompts": ["alpha", "beta"], "threshold": 0.5}).json()
+    for e, g in zip(expected["queries"], got["queries"]):
+        assert [(r["group"], r["text"]) for r in g["results"]] == [(r["group"], r["text"]) for r in e["results"]]
+        assert [r["similarity"] for r in g["results"]] == pytest.approx([r["similarity"] for r in e["results"]], abs=1e-3)
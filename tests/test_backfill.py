@@ -0,0 +1,104 @@
+"""Tests for ragdoll_ingest.backfill (summary stripping, continue mode)."""
+
+import sqlite3
+import time
+
+import pytest
+
+from ragdoll_ingest import backfill
+from ragdoll_ingest.storage import add_chunks, init_db, iter_chunk_texts_for_source, list_sources, update_chunk_texts
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Counts of the (faked) LLM summary and embed calls made by the backfill."""
+    counts = {"summarize": 0, "embed": 0}
+
+    async def fake_summarize(text, group="_root", filename=None, semaphore=None):
+        counts["summarize"] += 1
+        return "A short summary."
+
+    def fake_embed_many(texts, group=None):
+        counts["embed"] += 1
+        return [[1.0, 0.0]] * len(texts)
+
+    monkeypatch.setattr(backfill, "summarize_document_async", fake_summarize)
+    monkeypatch.setattr(backfill, "embed_many", fake_embed_many)
+    return counts
+
+
+@pytest.fixture
+def conn(calls):
+    c = sqlite3.connect(":memory:")
+    c.row_factory = sqlite3.Row
+    init_db(c)
+    add_chunks(c, "/docs/a.txt", "text", [{"text": "first body", "embedding": [1.0, 0.0]}, {"text": "second body", "embedding": [0.0, 1.0]}])
+    c.commit()
+    yield c
+    c.close()
+
+
+@pytest.mark.parametrize(
+    "text, body",
+    [
+        ("body", "body"),
+        ("  body  ", "body"),
+        ("body\n\n[SUMMARY of a.txt: One sentence.]", "body"),
+        ("body [SUMMARY of a.txt: One.] [summary OF b.txt: Two.]  ", "body"),
+        ("body [SUMMARY of x: y] trailing", "body"),
+        ("body [SUMMARY of x: y] [SUMMARY of z: w] trailing", "body"),
+        ("body [SUMMARY of notes [v2].txt: y]", "body"),
+        ("body [SUMMARY of x: no closing bracket", "body [SUMMARY of x: no closing bracket"),
+        ("a] body [SUMMARY of x: unclosed", "a] body [SUMMARY of x: unclosed"),
+        ("[SUMMARY of x: y]", ""),
+        ("", ""),
+    ],
+)
+def test_strip_all_trailing_summaries(text, body):
+    assert backfill.strip_all_trailing_summaries(text) == body
+
+
+def test_strip_many_blocks_is_linear():
+    # One line (as clean_text stores chunks), many blocks, trailing text: must not backtrack
+    text = "body " + "[SUMMARY of x: y] " * 2000 + "trailing"
+    start = time.perf_counter()
+    assert backfill.strip_all_trailing_summaries.__wrapped__(text) == "body"
+    assert time.perf_counter() - start < 1.0
+
+
+def _texts(conn) -> list[str]:
+    source_id = list_sources(conn)[0][0]
+    return [text for _, text in iter_chunk_texts_for_source(conn, source_id)]
+
+
+def test_continue_skips_summarized_sources(conn, calls):
+    assert backfill.backfill_group(conn, "g", do_over=False) == (1, 2)
+    assert calls == {"summarize": 1, "embed": 1}
+    # Every chunk now carries a summary: no LLM or embed call on the next continue pass
+    assert backfill.backfill_group(conn, "g", do_over=False) == (0, 0)
+    assert calls == {"summarize": 1, "embed": 1}
+    # Do over redoes the source regardless
+    assert backfill.backfill_group(conn, "g", do_over=True) == (1, 2)
+    assert calls["summarize"] == 2
+    assert all(t.count("[SUMMARY of") == 1 for t in _texts(conn))
+
+
+def test_continue_resummarizes_after_strip(conn):
+    assert backfill.backfill_group(conn, "g", do_over=False) == (1, 2)
+    assert all(t.endswith("[SUMMARY of a.txt: A short summary.]") for t in _texts(conn))
+    # Nothing left to do on a second continue pass
+    assert backfill.backfill_group(conn, "g", do_over=False) == (0, 0)
+
+    # Strip summaries the way strip_summaries.py does; chunk bodies are unchanged
+    source_id = list_sources(conn)[0][0]
+    update_chunk_texts(
+        conn,
+        [
+            (chunk_id, backfill.strip_all_trailing_summaries(text), [1.0, 0.0])
+            for chunk_id, text in iter_chunk_texts_for_source(conn, source_id)
+        ],
+    )
+    assert _texts(conn) == ["first body", "second body"]
+
+    assert backfill.backfill_group(conn, "g", do_over=False) == (1, 2)
+    assert all(t.endswith("[SUMMARY of a.txt: A short summary.]") for t in _texts(conn))
@@ -0,0 +1,199 @@
+"""Tests for ragdoll_ingest.chunker (text cleanup, block splitting, long-block LLM split)."""
+
+import random
+import re
+
+import pytest
+import requests
+
+from ragdoll_ingest import chunker, config, ollama
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "DATA_DIR", tmp_path)
+    config.get_group_paths.cache_clear()
+    monkeypatch.setattr(chunker, "_split_schema_ok", True)
+    yield tmp_path
+    config.get_group_paths.cache_clear()
+
+
+def _http_error(status: int) -> requests.exceptions.HTTPError:
+    resp = requests.Response()
+    resp.status_code = status
+    return requests.exceptions.HTTPError(f"{status} error", response=resp)
+
+
+def test_llm_split_retries_json_format_when_schema_rejected(data_dir, monkeypatch):
+    formats = []
+
+    def fake_generate_text(base_url, payload, timeout, stop_after_json=False):
+        formats.append(payload["format"])
+        if isinstance(payload["format"], dict):
+            raise _http_error(400)  # Ollama before 0.5: format must be a string
+        return '{"chunks": ["First half.", "Second half."]}'
+
+    monkeypatch.setattr(ollama, "generate_text", fake_generate_text)
+    assert chunker._llm_split_long("First half. Second half.", "http://ollama") == ["First half.", "Second half."]
+    assert formats == [chunker._SPLIT_SCHEMA, "json"]
+    # Later splits skip the rejected schema request
+    assert chunker._llm_split_long("Another first. Another second.", "http://ollama")
+    assert formats[2:] == ["json"]
+
+
+def test_llm_split_other_http_errors_fall_back_to_mid_split(data_dir, monkeypatch):
+    formats = []
+
+    def fake_generate_text(base_url, payload, timeout, stop_after_json=False):
+        formats.append(payload["format"])
+        raise _http_error(500)
+
+    monkeypatch.setattr(ollama, "generate_text", fake_generate_text)
+    assert chunker._llm_split_long("First half. Second half.", "http://ollama") == ["First half.", "Second half."]
+    assert formats == [chunker._SPLIT_SCHEMA]
+    assert chunker._split_schema_ok
+
+
+# Reference copies of the original implementations that _clean_for_chunking, _snap_to_boundaries
+# and _iter_blocks replaced; the rewrites must produce identical output.
+
+
+def _baseline_clean_for_chunking(text: str) -> str:
+    if not text or not text.strip():
+        return ""
+    text = re.sub(r"\[([^\]]*)\]\([^)]*\)", r"\1", text)
+    text = re.sub(r"https?://\S+", " ", text)
+    text = re.sub(r"\*\*([^*]+)\*\*", r"\1", text)
+    text = re.sub(r"__([^_]+)__", r"\1", text)
+    text = re.sub(r"\*([^*]+)\*", r"\1", text)
+    text = re.sub(r"(?<!\w)_([^_]+)_(?!\w)", r"\1", text)
+    text = re.sub(r"^#+\s*", "", text, flags=re.MULTILINE)
+    text = re.sub(r"[ \t]+", " ", text)
+    text = re.sub(r"\r\n?", "\n", text)
+    text = re.sub(r"\n\s*\n\s*\n+", "\n\n", text)
+    return text.strip()
+
+
+def _baseline_snap_to_boundaries(text: str, start: int, end: int) -> tuple[int, int]:
+    n = len(text)
+    if n == 0:
+        return 0, 0
+    start = max(0, min(start, n - 1))
+    end = max(start, min(end, n))
+    for i in range(start, -1, -1):
+        if i == 0:
+            break
+        if i >= 2 and text[i - 2 : i] == "\n\n":
+            start = i
+            break
+        if i >= 2 and text[i - 1] in " \t" and text[i - 2] in ".!?":
+            start = i
+            break
+        if text[i - 1] == "\n":
+            start = i
+            break
+    else:
+        start = 0
+    for i in range(end, n + 1):
+        if i >= n:
+            end = n
+            break
+        if i <= n - 2 and text[i : i + 2] == "\n\n":
+            end = i + 2
+            break
+        if i < n and text[i] in ".!?" and (i + 1 >= n or text[i + 1] in " \t\n"):
+            end = i + 1
+            break
+        if i < n and text[i] == "\n":
+            end = i + 1
+            break
+    else:
+        end = n
+    return start, end
+
+
+def _baseline_looks_like_section_header(block: str) -> bool:
+    block = block.strip()
+    if not block:
+        return False
+    lines = [ln.strip() for ln in block.splitlines() if ln.strip()]
+    if len(lines) == 1 and re.match(r"^#+\s*\S", lines[0]):
+        return True
+    if len(lines) == 1 and len(lines[0]) <= 80:
+        line = lines[0]
+        if line.endswith(":"):
+            return True
+        if line.lower() in (
+            "key terms", "overview", "summary", "introduction", "background",
+            "key concepts", "key points", "glossary", "definitions", "references",
+        ):
+            return True
+        if len(line) <= 60 and "." not in line and "!" not in line and "?" not in line:
+            return True
+    if len(lines) == 2 and all(len(ln) <= 60 for ln in lines):
+        return True
+    return False
+
+
+def _baseline_split_blocks(text: str) -> list[str]:
+    text = text.strip()
+    if not text:
+        return []
+    out: list[str] = []
+    for b in re.split(r"\n\s*\n", text):
+        b = b.strip()
+        if not b:
+            continue
+        if max(1, len(b) // chunker.CHARS_PER_TOKEN) > config.MAX_CHUNK_TOKENS * 2:
+            out.extend(line.strip() for line in b.split("\n") if line.strip())
+        else:
+            out.append(b)
+    merged: list[str] = []
+    i = 0
+    while i < len(out):
+        if _baseline_looks_like_section_header(out[i]) and i + 1 < len(out):
+            merged.append(out[i].strip() + "\n\n" + out[i + 1].strip())
+            i += 2
+            continue
+        merged.append(out[i])
+        i += 1
+    return merged
+
+
+_PIECES = [
+    "word", "Key Terms", "Overview", "## Title", "#", "# ", " ", "  ", "\t", "\n", "\n\n", "\r\n", "\r", "\n \n",
+    ". ", "! ", "?\t", ".\n", ".", "*", "**", "_", "__", "snake_case", "[link](http://x.y/z)", "](", "[",
+    "https://a.b/c", "a sentence ends here.", "Heading:", "x" * 70, " ", "\v", "\x0c", " ",
+]
+
+
+def _random_texts(seed: int, count: int, max_pieces: int = 30):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield "".join(rng.choice(_PIECES) for _ in range(rng.randint(0, max_pieces)))
+
+
+def test_clean_for_chunking_matches_baseline():
+    for text in _random_texts(1, 20_000):
+        assert chunker._clean_for_chunking(text) == _baseline_clean_for_chunking(text), repr(text)
+
+
+def test_snap_to_boundaries_matches_baseline():
+    rng = random.Random(2)
+    for text in _random_texts(3, 5_000):
+        for _ in range(5):
+            start = rng.randint(-2, len(text) + 2)
+            end = rng.randint(-2, len(text) + 2)
+            assert chunker._snap_to_boundaries(text, start, end) == _baseline_snap_to_boundaries(text, start, end), (
+                repr(text), start, end,
+            )
+
+
+@pytest.mark.parametrize("max_chunk_tokens", [3, 500])
+def test_iter_blocks_matches_baseline(monkeypatch, max_chunk_tokens):
+    # A small MAX_CHUNK_TOKENS exercises the split-huge-blocks-by-line path
+    monkeypatch.setattr(config, "MAX_CHUNK_TOKENS", max_chunk_tokens)
+    for text in _random_texts(4, 10_000, max_pieces=60):
+        blocks = list(chunker._iter_blocks(text))
+        assert [b for b, _ in blocks] == _baseline_split_blocks(text), repr(text)
+        assert all(tokens == chunker._tokens_approx(b) for b, tokens in blocks)
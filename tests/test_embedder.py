@@ -0,0 +1,41 @@
+"""Tests for ragdoll_ingest.embedder.embed_many (dedupe and batching)."""
+
+import pytest
+
+from ragdoll_ingest import embedder
+
+
+@pytest.fixture
+def requests_seen(monkeypatch):
+    """Each embed() call's texts; a text's vector is [len(text), first char code]."""
+    seen: list[list[str]] = []
+
+    def fake_embed(texts, base_url=None, group="_root"):
+        seen.append(list(texts))
+        return [[float(len(t)), float(ord(t[0]))] for t in texts]
+
+    monkeypatch.setattr(embedder, "embed", fake_embed)
+    return seen
+
+
+def test_embed_many_embeds_each_distinct_text_once(requests_seen):
+    texts = ["aa", "b", "aa", "ccc", "b", "aa"]
+    out = embedder.embed_many(texts)
+    assert out == [[float(len(t)), float(ord(t[0]))] for t in texts]
+    assert requests_seen == [["aa", "b", "ccc"]]
+
+
+def test_embed_many_batches_by_count_and_chars(requests_seen):
+    texts = [f"t{i}" for i in range(7)] + ["x" * 50]
+    out = embedder.embed_many(texts, batch_size=3, max_chars=20)
+    assert out == [[float(len(t)), float(ord(t[0]))] for t in texts]
+    assert sorted(map(tuple, requests_seen)) == sorted(
+        [("t0", "t1", "t2"), ("t3", "t4", "t5"), ("t6",), ("x" * 50,)]
+    )
+
+
+def test_embed_many_count_mismatch_raises(monkeypatch):
+    monkeypatch.setattr(embedder, "embed", lambda texts, base_url=None, group="_root": [[1.0]])
+    with pytest.raises(RuntimeError):
+        embedder.embed_many(["a", "b"])
+    assert embedder.embed_many([]) == []
@@ -0,0 +1,55 @@
+"""Tests for ragdoll_ingest.similarity (NumPy and pure-Python paths agree)."""
+
+import math
+import random
+
+import pytest
+
+from ragdoll_ingest import similarity
+
+
+def _unit(v: list[float]) -> list[float]:
+    n = math.sqrt(sum(x * x for x in v))
+    return [x / n for x in v] if n else v
+
+
+@pytest.fixture
+def vectors():
+    rng = random.Random(5)
+    rows = [_unit([rng.uniform(-1, 1) for _ in range(16)]) for _ in range(200)]
+    queries = [[rng.uniform(-1, 1) for _ in range(16)] for _ in range(6)] + [[0.0] * 16]
+    return rows, queries
+
+
+def _brute_force(query, rows, threshold):
+    out = []
+    qn = math.sqrt(sum(x * x for x in query))
+    for i, row in enumerate(rows):
+        s = sum(a * b for a, b in zip(query, row)) / qn if qn else 0.0
+        if s >= threshold:
+            out.append((i, s))
+    return out
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_unit_matches_agree_with_brute_force(vectors, monkeypatch, use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(similarity, "np", None)
+    rows, queries = vectors
+    matrix = similarity.as_matrix(rows)
+    batch = similarity.unit_matches_batch(queries, matrix, 0.2)
+    for query, batch_matches in zip(queries, batch):
+        expected = _brute_force(query, rows, 0.2)
+        single = similarity.unit_matches(query, matrix, 0.2)
+        for got in (single, batch_matches):
+            assert [i for i, _ in got] == [i for i, _ in expected]
+            assert [s for _, s in got] == pytest.approx([s for _, s in expected], abs=1e-5)
+
+
+def test_unit_similarities_empty_and_zero_query():
+    assert similarity.unit_similarities([1.0, 0.0], []) == []
+    assert similarity.unit_matches_batch([], [[1.0, 0.0]], 0.0) == []
+    assert similarity.unit_matches_batch([[1.0, 0.0]], [], 0.0) == [[]]
+    assert similarity.unit_similarities([0.0, 0.0], [[1.0, 0.0]]) == [0.0]
@@ -0,0 +1,39 @@
+"""Tests for ragdoll_ingest.storage (read-only connection pool)."""
+
+import pytest
+
+from ragdoll_ingest import config, storage
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "DATA_DIR", tmp_path)
+    config.get_group_paths.cache_clear()
+    yield tmp_path
+    config.get_group_paths.cache_clear()
+
+
+def _create_db(group: str, source_path: str) -> None:
+    conn = storage._connect(group)
+    try:
+        storage.add_chunks(conn, source_path, "text", [{"text": "body", "embedding": [1.0, 0.0]}])
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def test_connect_readonly_reopens_replaced_db(data_dir):
+    _create_db("g", "/docs/old.txt")
+    ro = storage.connect_readonly("g")
+    assert storage.connect_readonly("g") is ro
+    assert [r["source_path"] for r in ro.execute("SELECT source_path FROM sources")] == ["/docs/old.txt"]
+
+    # Delete and recreate the DB: the pooled connection must not keep reading the old file
+    db_path = config.get_group_paths("g").rag_db_path
+    for p in db_path.parent.glob("ragdoll.db*"):
+        p.unlink()
+    _create_db("g", "/docs/new.txt")
+
+    ro2 = storage.connect_readonly("g")
+    assert ro2 is not ro
+    assert [r["source_path"] for r in ro2.execute("SELECT source_path FROM sources")] == ["/docs/new.txt"]
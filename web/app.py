@@ -4,6 +4,7 @@ import base64
 import csv
 import io
 import logging
+import os
 import re
 from pathlib import Path
 from typing import Any
@@ -176,14 +177,15 @@ def api_list_sources(group: str):
         raw = list_sources(conn)
         gp = config.get_group_paths(safe_group)
         sources_dir = gp.sources_dir.resolve()
+        sources_prefix = str(sources_dir)
         out = []
         for source_id, source_path, count, summary, external_url, display_title in raw:
             try:
                 p = Path(source_path)
-                if p.is_absolute() and str(p).startswith(str(sources_dir)):
+                if p.is_absolute() and str(p).startswith(sources_prefix):
                     fetch_path = p.relative_to(sources_dir)
                 else:
-                    fetch_path = Path(source_path).name if source_path else Path("")
+                    fetch_path = p.name if source_path else Path("")
                 fetch_path = str(fetch_path).replace("\\", "/")
             except Exception:
                 fetch_path = Path(source_path).name if source_path else ""
@@ -322,21 +324,9 @@ def api_fetch_source(group: str, path: str):
     gp = config.get_group_paths(safe_group)
     sources_dir = gp.sources_dir.resolve()
     file_path = (sources_dir / path).resolve()
-    if not str(file_path).startswith(str(sources_dir)) or not file_path.is_file():
+    if os.path.commonpath([str(sources_dir), str(file_path)]) != str(sources_dir) or not file_path.is_file():
         raise HTTPException(status_code=404, detail="Source file not found")
-    ext = file_path.suffix.lower()
-    media_types = {
-        ".pdf": "application/pdf",
-        ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        ".txt": "text/plain",
-        ".md": "text/markdown",
-        ".png": "image/png",
-        ".jpg": "image/jpeg",
-        ".jpeg": "image/jpeg",
-        ".gif": "image/gif",
-        ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-    }
-    media_type = media_types.get(ext, "application/octet-stream")
+    media_type = config.SOURCE_MEDIA_TYPES.get(file_path.suffix.lower(), "application/octet-stream")
     return FileResponse(
         path=str(file_path),
         media_type=media_type,